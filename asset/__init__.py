@@ -22,7 +22,9 @@
 from .symbol import *
 from .resource import *
 from .isstr import isstr
+from .index import ResourceIndex, invalidate
 from .plugin import plugin, plugins, PluginSet
+from .watcher import watch, Watcher
 
 #------------------------------------------------------------------------------
 # end of $Id$
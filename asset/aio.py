@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+#------------------------------------------------------------------------------
+# file: $Id$
+# auth: metagriffin <mg.github@uberdev.org>
+# date: 2026/10/18
+# copy: (C) Copyright 2013-EOT metagriffin -- see LICENSE.txt
+#------------------------------------------------------------------------------
+# This software is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#------------------------------------------------------------------------------
+
+# note: this module requires python 3.6+ and is only imported on demand
+#       by the `a*` methods in `asset.resource`.
+
+import asyncio
+import functools
+
+from .resource import load, AssetGroup, NoSuchAsset, MAXBUF
+
+#------------------------------------------------------------------------------
+
+_executor = None
+
+#------------------------------------------------------------------------------
+def setexecutor(executor):
+  '''
+  Sets the `concurrent.futures.Executor` that blocking asset work
+  (listing, opening and reading) is offloaded to. If ``None`` (the
+  default), the event loop's default executor is used.
+  '''
+  global _executor
+  _executor = executor
+
+#------------------------------------------------------------------------------
+def _run(func, *args):
+  loop = asyncio.get_running_loop()
+  return loop.run_in_executor(_executor, functools.partial(func, *args))
+
+#------------------------------------------------------------------------------
+def _resolve(item):
+  if isinstance(item, AssetGroup):
+    try:
+      item._resolve()
+    except NoSuchAsset:
+      pass
+  return item
+
+#------------------------------------------------------------------------------
+async def aload(pattern, *args, **kws):
+  '''
+  Asynchronous version of :func:`asset.load`: the returned group's
+  matching resources are resolved on the executor.
+  '''
+  return await _run(_resolve, load(pattern, *args, **kws))
+
+#------------------------------------------------------------------------------
+async def aread(item, size=-1):
+  return await _run(item.read, size)
+
+#------------------------------------------------------------------------------
+async def achunks(item, size=None):
+  '''
+  Asynchronous version of :func:`asset.chunks` over a new stream of
+  `item` (an Asset or AssetGroup). The next chunk is always being read
+  on the executor while the current one is being processed.
+  '''
+  stream  = await _run(item.stream)
+  pending = None
+  try:
+    if size == 'lines':
+      read = stream.readline
+    else:
+      read = functools.partial(stream.read, size or MAXBUF)
+    pending = _run(read)
+    while True:
+      buf = await pending
+      if not buf:
+        pending = None
+        return
+      pending = _run(read)
+      yield buf
+  finally:
+    if pending is not None:
+      await asyncio.wait([pending])
+    await _run(stream.close)
+
+#------------------------------------------------------------------------------
+async def aassets(group):
+  '''
+  Asynchronously generates the assets in `group`, resolving the
+  matching resources on the executor.
+  '''
+  assets = await _run(list, group)
+  for item in assets:
+    yield item
+
+#------------------------------------------------------------------------------
+# end of $Id$
+#------------------------------------------------------------------------------
@@ -0,0 +1,781 @@
+# -*- coding: utf-8 -*-
+#------------------------------------------------------------------------------
+# file: $Id$
+# auth: metagriffin <mg.github@uberdev.org>
+# date: 2026/10/18
+# copy: (C) Copyright 2013-EOT metagriffin -- see LICENSE.txt
+#------------------------------------------------------------------------------
+# This software is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#------------------------------------------------------------------------------
+
+import io
+import os
+import mmap
+import zlib
+import time
+import errno
+import bisect
+import struct
+import threading
+from zipimport import zipimporter
+
+import six
+from aadict import aadict
+
+from . import manifest
+
+try:
+  import importlib.util as importlib_util
+except ImportError:
+  importlib_util = None
+
+#------------------------------------------------------------------------------
+
+_backends = dict()
+_lock     = threading.Lock()
+
+# the (minimum) decompressed distance, in bytes, between checkpoints
+# in the random-access table of a deflated zip member
+CHECKPOINT = 1024 * 1024
+
+# the maximum number of checkpoints (each about 40 KiB), across all the
+# members of an archive, that are kept
+MAXCHECKPOINTS = 256
+
+#------------------------------------------------------------------------------
+def _readfully(read, length):
+  parts = []
+  while length > 0:
+    buf = read(length)
+    if not buf:
+      break
+    parts.append(buf)
+    length -= len(buf)
+  return b''.join(parts)
+
+#------------------------------------------------------------------------------
+def _preadfully(fd, offset, length):
+  parts = []
+  while length > 0:
+    buf = os.pread(fd, length, offset)
+    if not buf:
+      break
+    parts.append(buf)
+    offset += len(buf)
+    length -= len(buf)
+  return b''.join(parts)
+
+#------------------------------------------------------------------------------
+class _InflateIndex(object):
+  '''
+  A random-access index into a deflated zip member: a table of copies
+  of the decompressor's state, taken every :data:`CHECKPOINT` bytes of
+  output as the member is (partially) decompressed, from which reads
+  at any offset can resume. The state at the end of each read is also
+  kept as a "cursor", so that sequential reads never re-decompress.
+  For large members, the checkpoints are spaced further apart so that
+  the table never holds more than :data:`MAXCHECKPOINTS` of them.
+  '''
+
+  MAXCURSORS = 8
+
+  #----------------------------------------------------------------------------
+  def __init__(self, fd, start, info):
+    self.fd      = fd
+    self.start   = start
+    self.csize   = info.compress_size
+    self.size    = info.file_size
+    self.spacing = max(CHECKPOINT, self.size // max(1, MAXCHECKPOINTS - 1) + 1)
+    # parallel lists of (output offset) and (input offset, state)
+    self.offsets = [0]
+    self.points  = [(0, None)]
+    self.cursors = dict()
+    self.lock    = threading.Lock()
+
+  #----------------------------------------------------------------------------
+  def read(self, offset, length):
+    end = min(offset + length, self.size)
+    with self.lock:
+      cursor = self.cursors.pop(offset, None)
+      if cursor is not None:
+        pos = offset
+        cpos, pending, obj = cursor
+      else:
+        idx = bisect.bisect_right(self.offsets, offset) - 1
+        pos = self.offsets[idx]
+        cpos, obj = self.points[idx]
+        pending = b''
+        obj = zlib.decompressobj(-15) if obj is None else obj.copy()
+    parts = []
+    while pos < end and not obj.eof:
+      if not pending and cpos < self.csize:
+        pending = os.pread(
+          self.fd, min(max(end - pos, 16384), 262144, self.csize - cpos),
+          self.start + cpos)
+        if not pending:
+          raise IOError(errno.EIO, 'Truncated zip member data')
+        cpos += len(pending)
+      if pending:
+        buf = obj.decompress(pending, min(end - pos, 65536))
+        pending = obj.unconsumed_tail
+      else:
+        buf = obj.flush()
+        if not buf:
+          break
+      if pos + len(buf) > offset:
+        parts.append(buf[max(0, offset - pos):end - pos])
+      pos += len(buf)
+      if pos >= self.offsets[-1] + self.spacing and pos < self.size:
+        with self.lock:
+          if pos >= self.offsets[-1] + self.spacing:
+            self.offsets.append(pos)
+            self.points.append((cpos - len(pending), obj.copy()))
+    if pos < self.size and pos == end:
+      with self.lock:
+        if len(self.cursors) >= self.MAXCURSORS:
+          del self.cursors[next(iter(self.cursors))]
+        self.cursors[pos] = (cpos, pending, obj)
+    return b''.join(parts)
+
+#------------------------------------------------------------------------------
+class _ZipMemberStream(io.RawIOBase):
+  '''
+  A seekable raw stream over a stored or deflated zip member that is
+  read via :meth:`ZipBackend.read_range`. As with `zipfile`, the CRC
+  of the content is verified when the member is read sequentially
+  through to the end.
+  '''
+
+  #----------------------------------------------------------------------------
+  def __init__(self, backend, name, info):
+    super(_ZipMemberStream, self).__init__()
+    self.backend = backend
+    self.name    = name
+    self.info    = info
+    self._pos    = 0
+    self._crc    = 0
+    self._crcpos = 0
+
+  #----------------------------------------------------------------------------
+  def readable(self):
+    return True
+
+  #----------------------------------------------------------------------------
+  def seekable(self):
+    return True
+
+  #----------------------------------------------------------------------------
+  def seek(self, offset, whence=io.SEEK_SET):
+    if whence == io.SEEK_CUR:
+      offset += self._pos
+    elif whence == io.SEEK_END:
+      offset += self.info.file_size
+    if offset < 0:
+      raise ValueError('negative seek position %r' % (offset,))
+    self._pos = offset
+    return offset
+
+  #----------------------------------------------------------------------------
+  def tell(self):
+    return self._pos
+
+  #----------------------------------------------------------------------------
+  def read(self, size=-1):
+    if self.closed:
+      raise ValueError('I/O operation on closed stream')
+    if size is None or size < 0:
+      size = self.info.file_size - self._pos
+    buf = self.backend.read_range(self.name, self._pos, size)
+    if self._pos == self._crcpos:
+      self._crc     = zlib.crc32(buf, self._crc)
+      self._crcpos += len(buf)
+      if self._crcpos == self.info.file_size \
+          and self._crc & 0xffffffff != self.info.CRC:
+        import zipfile
+        raise zipfile.BadZipFile('Bad CRC-32 for file %r' % (self.name,))
+    self._pos += len(buf)
+    return buf
+
+  #----------------------------------------------------------------------------
+  def readall(self):
+    return self.read()
+
+  #----------------------------------------------------------------------------
+  def readinto(self, buf):
+    view = memoryview(buf).cast('B')
+    data = self.read(len(view))
+    view[:len(data)] = data
+    return len(data)
+
+#------------------------------------------------------------------------------
+class Backend(object):
+  '''
+  The generic package resource backend, which delegates all
+  operations to the package's `pkg_resources` provider. This is only
+  used when the package's install type cannot be determined via
+  `importlib`; subclasses implement the paths for specific types of
+  package installs. Note that `pkg_resources` is only imported when
+  this backend is actually used.
+  '''
+
+  #----------------------------------------------------------------------------
+  def __init__(self, package, provider=None):
+    self.package  = package
+    self.provider = provider
+
+  #----------------------------------------------------------------------------
+  def listdir(self, pkgdir):
+    '''
+    Generates ``(name, isdir)`` pairs, in no particular order, for
+    each entry in the package directory `pkgdir`.
+    '''
+    import pkg_resources
+    for name in pkg_resources.resource_listdir(self.package, pkgdir):
+      path = os.path.join(pkgdir, name)
+      yield (name, pkg_resources.resource_isdir(self.package, path))
+
+  #----------------------------------------------------------------------------
+  def open(self, name):
+    '''
+    Returns a binary file-like object that streams the content of the
+    resource `name`.
+    '''
+    import pkg_resources
+    return pkg_resources.resource_stream(self.package, name)
+
+  #----------------------------------------------------------------------------
+  def stat(self, name):
+    '''
+    Returns an aadict with the `size` (in bytes) and `mtime` (as epoch
+    seconds) of the resource `name` if they can be determined without
+    reading it, otherwise ``None``.
+    '''
+    path = self.filename(name)
+    if path is None:
+      return None
+    try:
+      st = os.stat(path)
+    except OSError:
+      return None
+    return aadict(size=st.st_size, mtime=st.st_mtime)
+
+  #----------------------------------------------------------------------------
+  def size(self, name):
+    '''
+    Returns the size, in bytes, of the resource `name` if it can be
+    determined without reading it, otherwise ``None``.
+    '''
+    st = self.stat(name)
+    return None if st is None else st.size
+
+  #----------------------------------------------------------------------------
+  def read_range(self, name, offset, length):
+    '''
+    Returns (at most) `length` bytes of the content of the resource
+    `name` starting at byte `offset`. The default implementation
+    seeks the resource's stream if possible, otherwise it reads and
+    discards the content up to `offset`.
+    '''
+    with self.open(name) as fp:
+      seekable = getattr(fp, 'seekable', None)
+      if seekable is not None and seekable():
+        fp.seek(offset)
+      else:
+        while offset > 0:
+          buf = fp.read(min(offset, io.DEFAULT_BUFFER_SIZE))
+          if not buf:
+            return b''
+          offset -= len(buf)
+      return _readfully(fp.read, length)
+
+  #----------------------------------------------------------------------------
+  def digest(self, name, algorithm):
+    '''
+    Returns the precomputed hex digest of the content of resource
+    `name` using hash `algorithm`, or ``None`` if not available.
+    '''
+    return None
+
+  #----------------------------------------------------------------------------
+  def fingerprint(self, name):
+    '''
+    Returns a string that identifies the content of the resource
+    `name` and that can be determined without reading it (e.g. from a
+    checksum recorded in an archive), or ``None`` if not available.
+    '''
+    return None
+
+  #----------------------------------------------------------------------------
+  def buffer(self, name):
+    '''
+    Returns a read-only ``memoryview`` of the content of the resource
+    `name`. The default implementation reads the resource into memory.
+    '''
+    with self.open(name) as fp:
+      return memoryview(fp.read())
+
+  #----------------------------------------------------------------------------
+  def filename(self, name):
+    '''
+    Returns the filesystem path to the resource `name`, or ``None`` if
+    the resource does not exist as a plain file.
+    '''
+    import pkg_resources
+    prov = self.provider or pkg_resources.get_provider(self.package)
+    if isinstance(prov, pkg_resources.ZipProvider):
+      return None
+    return pkg_resources.resource_filename(self.package, name)
+
+  #----------------------------------------------------------------------------
+  def stamp(self, pkgdir):
+    '''
+    Returns a value that changes whenever the listing of `pkgdir`
+    changes, or ``None`` if that cannot be determined cheaply (in
+    which case cached listings can only be invalidated explicitly).
+    '''
+    return None
+
+#------------------------------------------------------------------------------
+class DirBackend(Backend):
+  '''
+  A backend for packages installed as plain filesystem directories,
+  which bypasses any provider layer and uses
+  ``os.scandir`` so that the entry type comes from the directory read
+  itself instead of a separate ``stat`` per entry.
+  '''
+
+  #----------------------------------------------------------------------------
+  def __init__(self, package, root):
+    super(DirBackend, self).__init__(package)
+    self.root = root
+
+  #----------------------------------------------------------------------------
+  def path(self, name):
+    return os.path.join(self.root, name)
+
+  #----------------------------------------------------------------------------
+  if hasattr(os, 'scandir'):
+    def listdir(self, pkgdir):
+      with os.scandir(self.path(pkgdir)) as entries:
+        for entry in entries:
+          yield (entry.name, entry.is_dir())
+  else:
+    def listdir(self, pkgdir):
+      path = self.path(pkgdir)
+      for name in os.listdir(path):
+        yield (name, os.path.isdir(os.path.join(path, name)))
+
+  #----------------------------------------------------------------------------
+  def open(self, name):
+    return open(self.path(name), 'rb')
+
+  #----------------------------------------------------------------------------
+  def stat(self, name):
+    try:
+      st = os.stat(self.path(name))
+    except OSError:
+      return None
+    return aadict(size=st.st_size, mtime=st.st_mtime)
+
+  #----------------------------------------------------------------------------
+  if hasattr(os, 'pread'):
+    def read_range(self, name, offset, length):
+      fd = os.open(self.path(name), os.O_RDONLY)
+      try:
+        # `length` is clamped since `os.pread` allocates that much
+        length = min(length, os.fstat(fd).st_size - offset)
+        return _preadfully(fd, offset, length)
+      finally:
+        os.close(fd)
+
+  #----------------------------------------------------------------------------
+  def buffer(self, name):
+    # the file is memory-mapped so that the content is shared with the
+    # OS page cache (and therefore with other processes) instead of
+    # being copied into this process.
+    with open(self.path(name), 'rb') as fp:
+      try:
+        return memoryview(mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ))
+      except ValueError:
+        # empty files cannot be mapped
+        return memoryview(b'')
+
+  #----------------------------------------------------------------------------
+  def filename(self, name):
+    return self.path(name)
+
+  #----------------------------------------------------------------------------
+  def stamp(self, pkgdir):
+    try:
+      return os.stat(self.path(pkgdir)).st_mtime
+    except OSError:
+      return None
+
+#------------------------------------------------------------------------------
+class ZipBackend(Backend):
+  '''
+  A backend for packages installed in a zip archive (e.g. zipped
+  eggs). The archive's central directory is read once into an
+  in-memory directory tree, which is then used to answer all listing
+  and existence queries; the tree is rebuilt only if the archive's
+  modification time changes.
+  '''
+
+  #----------------------------------------------------------------------------
+  def __init__(self, package, archive, prefix=''):
+    super(ZipBackend, self).__init__(package)
+    self.archive = archive
+    self.prefix  = prefix.replace(os.sep, '/').strip('/')
+    if self.prefix:
+      self.prefix += '/'
+    self._stamp  = None
+    self._zip    = None
+    self._dirs   = None
+    self._infos  = None
+    self._lock   = threading.Lock()
+    self._offsets = dict()
+    from .cache import LRUCache
+    self._indexes = LRUCache(
+      MAXCHECKPOINTS, sizeof=lambda index: index.size // index.spacing + 1)
+
+  #----------------------------------------------------------------------------
+  def listdir(self, pkgdir):
+    dirs, zfp, infos = self._load()
+    return six.iteritems(dirs.get(pkgdir.strip('/'), {}))
+
+  #----------------------------------------------------------------------------
+  def open(self, name):
+    '''
+    Returns the archive member `name` as a stream that decompresses
+    incrementally as it is read, i.e. the member is never fully
+    materialized in memory. Stored and deflated members are returned
+    as seekable, buffered streams (see :meth:`read_range`).
+    '''
+    dirs, zfp, infos = self._load()
+    info = infos.get(name)
+    if info is None:
+      raise IOError(errno.ENOENT, 'No such resource in archive', name)
+    if not self._ranged(info):
+      return zfp.open(info)
+    # note: buffered so that small reads (e.g. `readline`) do not each
+    #       go through `read_range`
+    return io.BufferedReader(_ZipMemberStream(self, name, info))
+
+  #----------------------------------------------------------------------------
+  def read_range(self, name, offset, length):
+    '''
+    Reads the archive member `name` directly from the archive: stored
+    members are read at their offset in the archive, and deflated
+    members are decompressed from the closest entry in a (lazily
+    built and cached) table of decompressor checkpoints, so that the
+    cost is proportional to `length`, not to `offset`.
+    '''
+    dirs, zfp, infos = self._load()
+    info = infos.get(name)
+    if info is None:
+      raise IOError(errno.ENOENT, 'No such resource in archive', name)
+    if not self._ranged(info):
+      return super(ZipBackend, self).read_range(name, offset, length)
+    length = max(0, min(length, info.file_size - offset))
+    if not length:
+      return b''
+    fd    = zfp.fp.fileno()
+    start = self._offset(fd, info)
+    if not info.compress_type:
+      return _preadfully(fd, start + offset, length)
+    key   = (info.filename, info.header_offset)
+    index = self._indexes.get(key)
+    if index is None:
+      index = self._indexes.put(key, _InflateIndex(fd, start, info))
+    return index.read(offset, length)
+
+  #----------------------------------------------------------------------------
+  def _ranged(self, info):
+    # only unencrypted stored/deflated members can be read at an offset
+    return hasattr(os, 'pread') and not info.flag_bits & 0x1 \
+      and info.compress_type in (0, 8)
+
+  #----------------------------------------------------------------------------
+  def _offset(self, fd, info):
+    # returns the archive offset of the member's data, which follows
+    # the (variable-length) local file header.
+    ret = self._offsets.get(info.header_offset)
+    if ret is None:
+      header = _preadfully(fd, info.header_offset, 30)
+      if len(header) != 30 or header[:4] != b'PK\x03\x04':
+        raise IOError(errno.EIO, 'Bad zip member header', info.filename)
+      namelen, extralen = struct.unpack('<HH', header[26:30])
+      ret = self._offsets[info.header_offset] = \
+        info.header_offset + 30 + namelen + extralen
+    return ret
+
+  #----------------------------------------------------------------------------
+  def stat(self, name):
+    info = self.info(name)
+    if info is None:
+      return None
+    return aadict(
+      size  = info.file_size,
+      mtime = time.mktime(info.date_time + (0, 0, -1)))
+
+  #----------------------------------------------------------------------------
+  def filename(self, name):
+    return None
+
+  #----------------------------------------------------------------------------
+  def fingerprint(self, name):
+    # note: CRC-32 is not collision-resistant, so the fingerprint is
+    #       scoped to the archive member instead of being shared by any
+    #       content with the same checksum and size.
+    info = self.info(name)
+    if info is None:
+      return None
+    return 'zip:%s:%s:%08x:%d' % (
+      self.archive, name, info.CRC, info.file_size)
+
+  #----------------------------------------------------------------------------
+  def stamp(self, pkgdir):
+    try:
+      return os.stat(self.archive).st_mtime
+    except OSError:
+      return None
+
+  #----------------------------------------------------------------------------
+  def info(self, name):
+    '''
+    Returns the :class:`zipfile.ZipInfo` for the resource `name`, or
+    ``None`` if it is not a file in the archive.
+    '''
+    dirs, zfp, infos = self._load()
+    return infos.get(name)
+
+  #----------------------------------------------------------------------------
+  def _load(self):
+    stamp = self.stamp('')
+    with self._lock:
+      if self._dirs is None or stamp != self._stamp:
+        dirs  = {'': {}}
+        infos = dict()
+        # note: the ZipFile is kept open so that members can be opened
+        #       directly from their ZipInfo without re-reading the
+        #       central directory. open member streams keep the
+        #       underlying file alive even after it is replaced here.
+        import zipfile
+        zfp   = zipfile.ZipFile(self.archive)
+        for info in zfp.infolist():
+          if not info.filename.startswith(self.prefix):
+            continue
+          name  = info.filename[len(self.prefix):]
+          isdir = name.endswith('/')
+          parts = name.rstrip('/').split('/')
+          if not parts[0]:
+            continue
+          if not isdir:
+            infos[name] = info
+          for idx, part in enumerate(parts):
+            parent = '/'.join(parts[:idx])
+            subdir = isdir or idx < len(parts) - 1
+            entries = dirs.setdefault(parent, {})
+            entries[part] = entries.get(part, False) or subdir
+            if subdir:
+              dirs.setdefault('/'.join(parts[:idx + 1]), {})
+        if self._zip is not None:
+          self._zip.close()
+        self._offsets.clear()
+        self._indexes.clear()
+        self._zip, self._dirs, self._infos, self._stamp = zfp, dirs, infos, stamp
+      return self._dirs, self._zip, self._infos
+
+#------------------------------------------------------------------------------
+class ResourcesBackend(Backend):
+  '''
+  A backend for packages served by any other `importlib` loader that
+  supports ``importlib.resources.files()`` (e.g. custom importers).
+  '''
+
+  #----------------------------------------------------------------------------
+  def __init__(self, package, root):
+    super(ResourcesBackend, self).__init__(package)
+    self.root = root
+
+  #----------------------------------------------------------------------------
+  def path(self, name):
+    cur = self.root
+    for part in name.split('/'):
+      if part:
+        cur = cur.joinpath(part)
+    return cur
+
+  #----------------------------------------------------------------------------
+  def listdir(self, pkgdir):
+    for child in self.path(pkgdir).iterdir():
+      yield (child.name, child.is_dir())
+
+  #----------------------------------------------------------------------------
+  def open(self, name):
+    return self.path(name).open('rb')
+
+  #----------------------------------------------------------------------------
+  def filename(self, name):
+    path = self.path(name)
+    if isinstance(path, os.PathLike) and os.path.exists(path):
+      return os.fspath(path)
+    return None
+
+#------------------------------------------------------------------------------
+class ManifestBackend(Backend):
+  '''
+  A backend for packages that ship a build-time asset manifest (see
+  :mod:`asset.manifest`). All listing, existence and stat queries are
+  answered from the manifest, i.e. the package's resource tree is
+  never walked; content access is delegated to the `base` backend.
+  Since manifests are intended for immutable deployments, listings
+  are never invalidated implicitly.
+  '''
+
+  #----------------------------------------------------------------------------
+  def __init__(self, base, data):
+    super(ManifestBackend, self).__init__(base.package)
+    self.base      = base
+    self.algorithm = data.get('hash')
+    self.dirs      = data['dirs']
+
+  #----------------------------------------------------------------------------
+  def entry(self, name):
+    '''
+    Returns the manifest entry ``[ISDIR, SIZE, MTIME, DIGEST]`` for
+    the resource `name`, or ``None`` if it is not in the manifest.
+    '''
+    name = name.strip('/')
+    if '/' in name:
+      pkgdir, name = name.rsplit('/', 1)
+    else:
+      pkgdir = ''
+    return self.dirs.get(pkgdir, {}).get(name)
+
+  #----------------------------------------------------------------------------
+  def listdir(self, pkgdir):
+    entries = self.dirs.get(pkgdir.strip('/'))
+    if entries is None:
+      raise IOError(errno.ENOENT, 'No such directory in manifest', pkgdir)
+    for name, entry in six.iteritems(entries):
+      yield (name, bool(entry[0]))
+
+  #----------------------------------------------------------------------------
+  def stat(self, name):
+    entry = self.entry(name)
+    if entry is None:
+      return None
+    return aadict(size=entry[1], mtime=entry[2])
+
+  #----------------------------------------------------------------------------
+  def digest(self, name, algorithm):
+    if algorithm != self.algorithm:
+      return None
+    entry = self.entry(name)
+    return None if entry is None else entry[3]
+
+  #----------------------------------------------------------------------------
+  def open(self, name):
+    return self.base.open(name)
+
+  #----------------------------------------------------------------------------
+  def read_range(self, name, offset, length):
+    return self.base.read_range(name, offset, length)
+
+  #----------------------------------------------------------------------------
+  def buffer(self, name):
+    return self.base.buffer(name)
+
+  #----------------------------------------------------------------------------
+  def fingerprint(self, name):
+    entry = self.entry(name)
+    if entry is not None and entry[3]:
+      return '%s:%s:%d' % (self.algorithm, entry[3], entry[1])
+    return self.base.fingerprint(name)
+
+  #----------------------------------------------------------------------------
+  def filename(self, name):
+    return self.base.filename(name)
+
+#------------------------------------------------------------------------------
+def get(package):
+  '''
+  Returns the :class:`Backend` best suited to the package `package`.
+  '''
+  backend = _backends.get(package)
+  if backend is None:
+    with _lock:
+      backend = _backends.get(package)
+      if backend is None:
+        backend = _backends[package] = _create(package)
+  return backend
+
+#------------------------------------------------------------------------------
+def forget(package=None):
+  '''
+  Drops the memoized backend for `package` (or all backends), so
+  that the next :func:`get` re-inspects the package's installation.
+  '''
+  with _lock:
+    if package is None:
+      _backends.clear()
+    else:
+      _backends.pop(package, None)
+
+#------------------------------------------------------------------------------
+def _create(package):
+  store = _detect(package)
+  try:
+    with store.open(manifest.FILENAME) as fp:
+      return ManifestBackend(store, manifest.load(fp))
+  except (IOError, OSError, KeyError, ValueError):
+    return store
+
+#------------------------------------------------------------------------------
+def _detect(package):
+  spec = None
+  if importlib_util is not None:
+    try:
+      spec = importlib_util.find_spec(package)
+    except (ImportError, ValueError):
+      spec = None
+  if spec is not None:
+    origin = spec.origin if spec.has_location else None
+    if origin:
+      # note: like pkg_resources, the resource root is the directory
+      #       that contains the module's file
+      root = os.path.dirname(origin)
+      if isinstance(spec.loader, zipimporter):
+        archive = spec.loader.archive
+        return ZipBackend(package, archive, root[len(archive) + 1:])
+      if os.path.isdir(root):
+        return DirBackend(package, root)
+    try:
+      import importlib.resources
+      return ResourcesBackend(package, importlib.resources.files(package))
+    except (ImportError, AttributeError, TypeError, ValueError):
+      pass
+  import pkg_resources
+  prov = pkg_resources.get_provider(package)
+  if isinstance(prov, pkg_resources.DefaultProvider):
+    return DirBackend(package, prov.module_path)
+  if isinstance(prov, pkg_resources.ZipProvider):
+    return ZipBackend(
+      package, prov.loader.archive, prov.module_path[len(prov.zip_pre):])
+  return Backend(package, prov)
+
+#------------------------------------------------------------------------------
+# end of $Id$
+#------------------------------------------------------------------------------
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#------------------------------------------------------------------------------
+# file: $Id$
+# auth: metagriffin <mg.github@uberdev.org>
+# date: 2026/10/18
+# copy: (C) Copyright 2013-EOT metagriffin -- see LICENSE.txt
+#------------------------------------------------------------------------------
+# This software is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#------------------------------------------------------------------------------
+
+import os
+
+import setuptools
+from setuptools.command.build_py import build_py as _build_py
+
+from .isstr import isstr
+from . import manifest
+
+#------------------------------------------------------------------------------
+class asset_manifest(setuptools.Command):
+  '''
+  A setuptools command that writes an asset manifest (see
+  :mod:`asset.manifest`) into each built package, so that the
+  package's resource tree does not need to be walked at runtime. It
+  is registered as the ``asset_manifest`` command, i.e.::
+
+    $ python setup.py build asset_manifest
+
+  or it can be run automatically after ``build_py`` with::
+
+    setup(
+      ...
+      cmdclass = {'build_py': asset.build.build_py},
+    )
+  '''
+
+  description = 'generate asset manifests for the built packages'
+
+  user_options = [
+    ('build-lib=', 'd', 'directory containing the built packages'),
+    ('packages=', 'p', 'comma-separated list of packages (default: all)'),
+    ('no-hashes', None, 'do not record content digests in the manifests'),
+  ]
+  boolean_options = ['no-hashes']
+
+  #----------------------------------------------------------------------------
+  def initialize_options(self):
+    self.build_lib = None
+    self.packages  = None
+    self.no_hashes = False
+
+  #----------------------------------------------------------------------------
+  def finalize_options(self):
+    self.set_undefined_options('build_py', ('build_lib', 'build_lib'))
+    if self.packages is None:
+      self.packages = self.distribution.packages or []
+    elif isstr(self.packages):
+      self.packages = [pkg.strip() for pkg in self.packages.split(',')
+                       if pkg.strip()]
+
+  #----------------------------------------------------------------------------
+  def run(self):
+    algorithm = None if self.no_hashes else manifest.ALGORITHM
+    for package in self.packages:
+      root = os.path.join(self.build_lib, *package.split('.'))
+      if not os.path.isdir(root):
+        continue
+      path = manifest.write(root, algorithm=algorithm)
+      self.announce('wrote asset manifest %s' % (path,), level=2)
+
+#------------------------------------------------------------------------------
+class build_py(_build_py):
+  '''
+  A drop-in replacement for the setuptools ``build_py`` command that
+  also runs :class:`asset_manifest` on the built packages.
+  '''
+
+  #----------------------------------------------------------------------------
+  def run(self):
+    _build_py.run(self)
+    self.run_command('asset_manifest')
+
+#------------------------------------------------------------------------------
+# end of $Id$
+#------------------------------------------------------------------------------
@@ -0,0 +1,405 @@
+# -*- coding: utf-8 -*-
+#------------------------------------------------------------------------------
+# file: $Id$
+# auth: metagriffin <mg.github@uberdev.org>
+# date: 2026/10/18
+# copy: (C) Copyright 2013-EOT metagriffin -- see LICENSE.txt
+#------------------------------------------------------------------------------
+# This software is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#------------------------------------------------------------------------------
+
+import os
+import time
+import errno
+import shutil
+import hashlib
+import tempfile
+import threading
+import collections
+
+from aadict import aadict
+
+from . import backend
+
+#------------------------------------------------------------------------------
+
+# the default number of seconds during which a cached asset's content
+# is trusted without re-checking the resource's size and mtime.
+INTERVAL = 1.0
+
+#------------------------------------------------------------------------------
+class LRUCache(object):
+  '''
+  A thread-safe, bounded, least-recently-used mapping. The bound is
+  expressed in "units" as computed by the `sizeof` callable (which
+  defaults to one unit per entry), so the same class can be bounded
+  by entry count or by byte size. Hit, miss and eviction counters
+  are available via :meth:`stats`.
+  '''
+
+  #----------------------------------------------------------------------------
+  def __init__(self, maxsize=None, sizeof=None):
+    self.maxsize   = maxsize
+    self.sizeof    = sizeof or (lambda value: 1)
+    self.size      = 0
+    self.hits      = 0
+    self.misses    = 0
+    self.evictions = 0
+    self._data     = collections.OrderedDict()
+    self._lock     = threading.RLock()
+
+  #----------------------------------------------------------------------------
+  def get(self, key, default=None):
+    with self._lock:
+      try:
+        item = self._data.pop(key)
+      except KeyError:
+        self.misses += 1
+        return default
+      self._data[key] = item
+      self.hits += 1
+      return item[0]
+
+  #----------------------------------------------------------------------------
+  def put(self, key, value):
+    size = self.sizeof(value)
+    with self._lock:
+      self._remove(key)
+      if self.maxsize is not None and size > self.maxsize:
+        return value
+      self._data[key] = (value, size)
+      self.size += size
+      while self.maxsize is not None and self.size > self.maxsize:
+        okey, oitem = self._data.popitem(last=False)
+        self.size -= oitem[1]
+        self.evictions += 1
+      return value
+
+  #----------------------------------------------------------------------------
+  def pop(self, key, default=None):
+    with self._lock:
+      if key not in self._data:
+        return default
+      return self._remove(key)
+
+  #----------------------------------------------------------------------------
+  def prune(self, match):
+    '''
+    Removes all entries whose key satisfies the callable `match`.
+    '''
+    with self._lock:
+      for key in [key for key in self._data if match(key)]:
+        self._remove(key)
+
+  #----------------------------------------------------------------------------
+  def clear(self):
+    with self._lock:
+      self._data.clear()
+      self.size = 0
+
+  #----------------------------------------------------------------------------
+  def stats(self):
+    with self._lock:
+      return aadict(
+        hits      = self.hits,
+        misses    = self.misses,
+        evictions = self.evictions,
+        count     = len(self._data),
+        size      = self.size,
+        maxsize   = self.maxsize,
+      )
+
+  #----------------------------------------------------------------------------
+  def _remove(self, key):
+    item = self._data.pop(key, None)
+    if item is None:
+      return None
+    self.size -= item[1]
+    return item[0]
+
+  #----------------------------------------------------------------------------
+  def __contains__(self, key):
+    return key in self._data
+
+  #----------------------------------------------------------------------------
+  def __len__(self):
+    return len(self._data)
+
+#------------------------------------------------------------------------------
+class _Entry(object):
+  __slots__ = ('data', 'stat', 'checked')
+  def __init__(self, data, stat, checked):
+    self.data    = data
+    self.stat    = stat
+    self.checked = checked
+
+#------------------------------------------------------------------------------
+class ContentCache(object):
+  '''
+  A cache of asset content keyed by ``(package, resource name)``,
+  bounded by the total byte size `maxsize` with LRU eviction. Assets
+  larger than `maxentry` bytes are never cached.
+
+  Each entry is validated against the resource's size and mtime (as
+  reported by the package backend), but at most once every `interval`
+  seconds so that hot assets are served without any system calls. If
+  `interval` is ``None``, entries are never re-validated (which is
+  suitable for immutable deployments); if ``0``, they are validated on
+  every access. Only resources whose size and mtime are available are
+  cached.
+  '''
+
+  #----------------------------------------------------------------------------
+  def __init__(self, maxsize, maxentry=None, interval=INTERVAL):
+    self.maxentry = maxsize if maxentry is None else maxentry
+    self.interval = interval
+    self.hits     = 0
+    self.misses   = 0
+    self._lru     = LRUCache(maxsize, sizeof=lambda entry: len(entry.data))
+
+  #----------------------------------------------------------------------------
+  def fetch(self, package, name):
+    '''
+    Returns the content of resource `name` in package `package` from
+    the cache, loading (and caching) it on a miss. Returns ``None`` if
+    the resource is not cacheable, in which case the caller should
+    read it directly.
+    '''
+    key   = (package, name)
+    store = backend.get(package)
+    now   = time.time()
+    entry = self._lru.get(key)
+    if entry is not None:
+      if self.interval is None or now - entry.checked < self.interval \
+          or store.stat(name) == entry.stat:
+        entry.checked = now
+        self.hits += 1
+        return entry.data
+      self._lru.pop(key)
+    self.misses += 1
+    stat = store.stat(name)
+    if stat is None or stat.size > self.maxentry:
+      return None
+    with store.open(name) as fp:
+      data = fp.read()
+    # don't cache content that changed while it was being read
+    if store.stat(name) == stat:
+      self._lru.put(key, _Entry(data, stat, now))
+    return data
+
+  #----------------------------------------------------------------------------
+  def invalidate(self, package=None, name=None):
+    if package is None:
+      self._lru.clear()
+    elif name is None:
+      self._lru.prune(lambda key: key[0] == package)
+    else:
+      self._lru.pop((package, name))
+
+  #----------------------------------------------------------------------------
+  def stats(self):
+    ret = self._lru.stats()
+    ret.hits   = self.hits
+    ret.misses = self.misses
+    return ret
+
+_content = None
+
+# the maximum number of memoized asset content digests
+MAXDIGESTS = 4096
+
+_digests = LRUCache(MAXDIGESTS)
+
+#------------------------------------------------------------------------------
+def digest(package, name, algorithm):
+  '''
+  Returns the hex digest of the content of resource `name` in package
+  `package` using the hashlib hash `algorithm`. Digests recorded in
+  the package's asset manifest are used as-is; otherwise the content
+  is hashed in a streaming fashion and the result is memoized, and
+  re-validated against the resource's size and mtime at most once
+  every :data:`INTERVAL` seconds.
+  '''
+  store = backend.get(package)
+  value = store.digest(name, algorithm)
+  if value:
+    return value
+  key   = (package, name, algorithm)
+  now   = time.time()
+  entry = _digests.get(key)
+  if entry is not None:
+    if now - entry.checked < INTERVAL or store.stat(name) == entry.stat:
+      entry.checked = now
+      return entry.data
+  stat  = store.stat(name)
+  value = hashlib.new(algorithm)
+  buf   = bytearray(65536)
+  view  = memoryview(buf)
+  with store.open(name) as fp:
+    while True:
+      count = fp.readinto(buf)
+      if not count:
+        break
+      value.update(view[:count])
+  value = value.hexdigest()
+  if store.stat(name) == stat:
+    _digests.put(key, _Entry(value, stat, now))
+  return value
+
+#------------------------------------------------------------------------------
+
+# the directory that assets which are not plain files (e.g. members of
+# zipped packages) are extracted to by `extract`. if ``None``, it is
+# taken from the ``ASSET_CACHEDIR`` environment variable, and defaults
+# to "python-asset" in the user's cache directory.
+CACHEDIR = None
+
+# the maximum number of memoized extracted asset paths
+MAXEXTRACTED = 4096
+
+_extracted = LRUCache(MAXEXTRACTED)
+
+#------------------------------------------------------------------------------
+def cachedir():
+  '''
+  Returns the directory that assets are extracted to (see :data:`CACHEDIR`).
+  '''
+  if CACHEDIR:
+    return CACHEDIR
+  if os.environ.get('ASSET_CACHEDIR'):
+    return os.environ['ASSET_CACHEDIR']
+  root = os.environ.get('XDG_CACHE_HOME') \
+    or os.path.join(os.path.expanduser('~'), '.cache')
+  return os.path.join(root, 'python-asset')
+
+#------------------------------------------------------------------------------
+def extract(package, name):
+  '''
+  Returns the path to a plain-file copy of resource `name` in package
+  `package`, extracting it on demand. Extracted files are
+  content-addressed, i.e. stored under :func:`cachedir` by a key
+  derived from the resource's checksum (from the package's asset
+  manifest or the zip archive if possible, otherwise from its digest)
+  and keep the resource's basename. Since zip CRC-32s are not
+  collision-resistant, their keys also include the archive path and
+  member name. They are therefore shared by all
+  processes and reused across restarts, and since each file is
+  written to a temporary file that is then atomically renamed into
+  place, concurrent extractions are safe.
+  '''
+  store = backend.get(package)
+  key   = (package, name)
+  now   = time.time()
+  entry = _extracted.get(key)
+  if entry is not None and os.path.exists(entry.data):
+    if now - entry.checked < INTERVAL or store.stat(name) == entry.stat:
+      entry.checked = now
+      return entry.data
+  stat  = store.stat(name)
+  ident = store.fingerprint(name) \
+    or 'sha256:' + digest(package, name, 'sha256')
+  ident = hashlib.sha256(ident.encode('utf-8')).hexdigest()
+  path  = os.path.join(
+    cachedir(), ident[:2], ident[2:], name.rstrip('/').rsplit('/', 1)[-1])
+  try:
+    current = os.stat(path).st_size == stat.size if stat else os.path.exists(path)
+  except OSError:
+    current = False
+  if not current:
+    _extract(store, name, path)
+  _extracted.put(key, _Entry(path, stat, now))
+  return path
+
+#------------------------------------------------------------------------------
+def _extract(store, name, path):
+  dirname = os.path.dirname(path)
+  try:
+    os.makedirs(dirname)
+  except OSError as err:
+    if err.errno != errno.EEXIST:
+      raise
+  fd, tmp = tempfile.mkstemp(dir=dirname, prefix='.extract-')
+  try:
+    with os.fdopen(fd, 'wb') as fp:
+      with store.open(name) as src:
+        shutil.copyfileobj(src, fp, 65536)
+      fp.flush()
+      os.fsync(fp.fileno())
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+  except BaseException:
+    try:
+      os.unlink(tmp)
+    except OSError:
+      pass
+    raise
+
+#------------------------------------------------------------------------------
+def enable(maxsize=64 * 1024 * 1024, maxentry=1024 * 1024, interval=INTERVAL):
+  '''
+  Enables the in-process asset content cache, which is used by
+  :meth:`Asset.stream` (and therefore by :meth:`Asset.read`,
+  :meth:`AssetGroup.read` and :class:`AssetGroupStream`). See
+  :class:`ContentCache` for a description of the parameters. Returns
+  the new cache.
+  '''
+  global _content
+  _content = ContentCache(maxsize, maxentry=maxentry, interval=interval)
+  return _content
+
+#------------------------------------------------------------------------------
+def disable():
+  '''
+  Disables (and discards) the asset content cache.
+  '''
+  global _content
+  _content = None
+
+#------------------------------------------------------------------------------
+def fetch(package, name):
+  content = _content
+  if content is None:
+    return None
+  return content.fetch(package, name)
+
+#------------------------------------------------------------------------------
+def invalidate(package=None, name=None):
+  '''
+  Drops the cached content, digests and extracted paths of resource
+  `name` in package `package`, of all resources in `package`, or of
+  everything. Note that extracted files are not deleted.
+  '''
+  content = _content
+  if content is not None:
+    content.invalidate(package, name)
+  for lru in (_digests, _extracted):
+    if package is None:
+      lru.clear()
+    elif name is None:
+      lru.prune(lambda key: key[0] == package)
+    else:
+      lru.prune(lambda key: key[:2] == (package, name))
+
+#------------------------------------------------------------------------------
+def stats():
+  '''
+  Returns the content cache counters (hits, misses, evictions, size,
+  etc), or ``None`` if the cache is not enabled.
+  '''
+  content = _content
+  return None if content is None else content.stats()
+
+#------------------------------------------------------------------------------
+# end of $Id$
+#------------------------------------------------------------------------------
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+#------------------------------------------------------------------------------
+# file: $Id$
+# auth: metagriffin <mg.github@uberdev.org>
+# date: 2026/10/18
+# copy: (C) Copyright 2013-EOT metagriffin -- see LICENSE.txt
+#------------------------------------------------------------------------------
+# This software is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#------------------------------------------------------------------------------
+
+import bisect
+import threading
+
+from .cache import LRUCache
+from . import backend
+
+#------------------------------------------------------------------------------
+
+# the maximum number of directory entries, across all packages, that
+# are kept in the in-process resource index.
+MAXENTRIES = 65536
+
+#------------------------------------------------------------------------------
+class _Listing(object):
+  __slots__ = ('stamp', 'entries')
+  def __init__(self, stamp, entries):
+    self.stamp   = stamp
+    self.entries = entries
+
+_cache   = LRUCache(MAXENTRIES, sizeof=lambda listing: len(listing.entries) + 1)
+_indexes = dict()
+_lock    = threading.Lock()
+
+#------------------------------------------------------------------------------
+def _split(name):
+  if '/' in name:
+    return name.rsplit('/', 1)
+  return '', name
+
+#------------------------------------------------------------------------------
+def _find(entries, name):
+  idx = bisect.bisect_left(entries, (name,))
+  if idx < len(entries) and entries[idx][0] == name:
+    return entries[idx][1]
+  return None
+
+#------------------------------------------------------------------------------
+class ResourceIndex(object):
+  '''
+  A per-package, in-process index of the directory listings of a
+  package's resources. Listings are cached in a bounded LRU shared by
+  all packages and are validated against the directory's (or, for
+  zipped packages, the archive's) modification time, so that changes
+  on disk are picked up without an explicit :func:`invalidate`.
+  '''
+
+  #----------------------------------------------------------------------------
+  def __init__(self, package):
+    self.package = package
+
+  #----------------------------------------------------------------------------
+  def listdir(self, pkgdir):
+    '''
+    Returns a sorted tuple of ``(name, isdir)`` pairs for each entry
+    in the package directory `pkgdir`.
+    '''
+    key     = (self.package, pkgdir)
+    store   = backend.get(self.package)
+    stamp   = store.stamp(pkgdir)
+    listing = _cache.get(key)
+    if listing is not None and listing.stamp == stamp:
+      return listing.entries
+    entries = tuple(sorted(store.listdir(pkgdir)))
+    _cache.put(key, _Listing(stamp, entries))
+    return entries
+
+  #----------------------------------------------------------------------------
+  def lookup(self, name):
+    '''
+    Returns ``True`` if `name` is a directory in this package,
+    ``False`` if it is a file, and ``None`` if it does not exist.
+    '''
+    name = name.strip('/')
+    if not name:
+      return True
+    pkgdir, name = _split(name)
+    try:
+      entries = self.listdir(pkgdir)
+    except (OSError, IOError):
+      return None
+    return _find(entries, name)
+
+  #----------------------------------------------------------------------------
+  def sibling(self, name, suffixes):
+    '''
+    Returns the first of `suffixes` for which `name` + suffix is a file
+    in this package, or ``None`` if there is no such file. Only the
+    (cached) listing of `name`'s directory is consulted.
+    '''
+    pkgdir, name = _split(name.strip('/'))
+    try:
+      entries = self.listdir(pkgdir)
+    except (OSError, IOError):
+      return None
+    for suffix in suffixes:
+      if _find(entries, name + suffix) is False:
+        return suffix
+    return None
+
+  #----------------------------------------------------------------------------
+  def exists(self, name):
+    return self.lookup(name) is not None
+
+  #----------------------------------------------------------------------------
+  def invalidate(self, pkgdir=None):
+    if pkgdir is None:
+      _cache.prune(lambda key: key[0] == self.package)
+    else:
+      _cache.pop((self.package, pkgdir))
+
+#------------------------------------------------------------------------------
+def get(package):
+  '''
+  Returns the :class:`ResourceIndex` for the package named `package`.
+  '''
+  index = _indexes.get(package)
+  if index is None:
+    with _lock:
+      index = _indexes.setdefault(package, ResourceIndex(package))
+  return index
+
+#------------------------------------------------------------------------------
+def invalidate(package=None, pkgdir=None):
+  '''
+  Drops cached resource listings. If `package` is not specified, the
+  entire index is cleared; otherwise only the listings for `package`
+  (or only its directory `pkgdir`, if specified) are dropped.
+  '''
+  if package is None:
+    _cache.clear()
+    backend.forget()
+    return
+  get(package).invalidate(pkgdir)
+  if pkgdir is None:
+    backend.forget(package)
+
+#------------------------------------------------------------------------------
+def stats():
+  '''
+  Returns the index cache counters (hits, misses, evictions, etc).
+  '''
+  return _cache.stats()
+
+#------------------------------------------------------------------------------
+# end of $Id$
+#------------------------------------------------------------------------------
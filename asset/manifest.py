@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#------------------------------------------------------------------------------
+# file: $Id$
+# auth: metagriffin <mg.github@uberdev.org>
+# date: 2026/10/18
+# copy: (C) Copyright 2013-EOT metagriffin -- see LICENSE.txt
+#------------------------------------------------------------------------------
+# This software is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#------------------------------------------------------------------------------
+
+'''
+Package asset manifests are JSON files, generated at build time and
+stored at the root of a package as ``.asset-manifest.json``, that
+record the package's entire resource tree so that it never needs to be
+walked at runtime. The format is::
+
+  {
+    "version": 1,
+    "hash": "sha256",
+    "dirs": {
+      "PKGDIR": {
+        "NAME": [ISDIR, SIZE, MTIME, DIGEST],
+        ...
+      },
+      ...
+    }
+  }
+
+where ``PKGDIR`` is the ``/``-separated path of each directory
+relative to the package root (``""`` for the root itself) and
+``DIGEST`` is the hex digest of the file content using the "hash"
+algorithm (or ``null`` for directories or if hashing was disabled).
+'''
+
+import os
+import json
+import hashlib
+
+#------------------------------------------------------------------------------
+
+FILENAME  = '.asset-manifest.json'
+VERSION   = 1
+ALGORITHM = 'sha256'
+
+#------------------------------------------------------------------------------
+def generate(root, algorithm=ALGORITHM):
+  '''
+  Returns the manifest (as a dict) of the package directory `root`.
+  If `algorithm` is ``None``, file digests are not computed.
+  '''
+  dirs = dict()
+  for path, subdirs, files in os.walk(root):
+    pkgdir = os.path.relpath(path, root).replace(os.sep, '/')
+    if pkgdir == '.':
+      pkgdir = ''
+    entries = dirs[pkgdir] = dict()
+    for name in subdirs:
+      st = os.stat(os.path.join(path, name))
+      entries[name] = [True, st.st_size, st.st_mtime, None]
+    for name in files:
+      if not pkgdir and name == FILENAME:
+        continue
+      cur = os.path.join(path, name)
+      st  = os.stat(cur)
+      entries[name] = [
+        False, st.st_size, st.st_mtime,
+        _digest(cur, algorithm) if algorithm else None]
+  return dict(version=VERSION, hash=algorithm, dirs=dirs)
+
+#------------------------------------------------------------------------------
+def write(root, algorithm=ALGORITHM):
+  '''
+  Generates the manifest of the package directory `root` and writes
+  it to the package. Returns the path to the manifest file.
+  '''
+  data = generate(root, algorithm=algorithm)
+  path = os.path.join(root, FILENAME)
+  with open(path, 'w') as fp:
+    json.dump(data, fp, sort_keys=True, separators=(',', ':'))
+  return path
+
+#------------------------------------------------------------------------------
+def load(stream):
+  '''
+  Parses the manifest from the binary `stream`. Raises ValueError if
+  the manifest is malformed or of an unsupported version.
+  '''
+  data = json.loads(stream.read().decode('utf-8'))
+  if not isinstance(data, dict) or data.get('version') != VERSION \
+      or not isinstance(data.get('dirs'), dict):
+    raise ValueError('unsupported asset manifest format')
+  return data
+
+#------------------------------------------------------------------------------
+def _digest(path, algorithm):
+  digest = hashlib.new(algorithm)
+  with open(path, 'rb') as fp:
+    while True:
+      buf = fp.read(65536)
+      if not buf:
+        break
+      digest.update(buf)
+  return digest.hexdigest()
+
+#------------------------------------------------------------------------------
+# end of $Id$
+#------------------------------------------------------------------------------
@@ -23,9 +23,8 @@ import re
 import logging
 
 import six
-import pkg_resources
 from aadict import aadict
-from .symbol import symbol
+from .symbol import symbol, importlib_metadata
 
 #------------------------------------------------------------------------------
 
@@ -114,7 +113,8 @@ def plugins(group, spec=None):
   '''
   Returns a `PluginSet` object for the specified setuptools-style
   entrypoint `group`. This is just a wrapper around
-  `pkg_resources.iter_entry_points` that allows the plugins to sort
+  `importlib.metadata.entry_points` (or, if that is not available,
+  `pkg_resources.iter_entry_points`) that allows the plugins to sort
   and override themselves.
 
   The optional `spec` parameter controls how and what plugins are
@@ -272,10 +272,21 @@ def _decorate_plugin(plugin):
   plugin.final   = getattr(plugin.handle, 'final',        False)
   plugin.name    = getattr(plugin.handle, 'plugin_name',  plugin.name)
 
+#------------------------------------------------------------------------------
+def _iter_entry_points(group):
+  metadata = importlib_metadata()
+  if metadata is None:
+    import pkg_resources
+    return pkg_resources.iter_entry_points(group)
+  eps = metadata.entry_points()
+  if hasattr(eps, 'select'):
+    return eps.select(group=group)
+  return eps.get(group, ())
+
 #------------------------------------------------------------------------------
 def _get_registered_plugins(group, spec=None):
   spec = _parse_spec(spec)
-  for entrypoint in pkg_resources.iter_entry_points(group):
+  for entrypoint in _iter_entry_points(group):
     plugin = aadict(
       name         = entrypoint.name,
       entrypoint   = entrypoint,
@@ -21,80 +21,200 @@
 
 import re
 import os
+import io
+import errno
+import hashlib
+import itertools
 import functools
+import collections
 
-import pkg_resources
 import six
 import globre
+from aadict import aadict
 
 from .symbol import symbol
+from .isstr import isstr
+from .cache import LRUCache
+from . import cache
+from . import index
+from . import backend
+from . import transform
 
 #------------------------------------------------------------------------------
 
 MAXBUF = 8192
 
+# the maximum number of compiled `load` specs that are memoized
+MAXSPECS = 1024
+
+# the filename suffixes of precompressed asset variants, by their HTTP
+# content-coding
+ENCODINGS = collections.OrderedDict((
+  ('br',    '.br'),
+  ('gzip',  '.gz'),
+  ('zstd',  '.zst'),
+))
+
 #------------------------------------------------------------------------------
 class NoSuchAsset(Exception): pass
 
 
 #------------------------------------------------------------------------------
-class AssetGroupStream(object):
-  # TODO: implement all expected file-like methods...
+def _checkopen(stream):
+  if stream.closed:
+    raise ValueError('I/O operation on closed stream')
+
+#------------------------------------------------------------------------------
+def _join(parts):
+  # joins bytes or (transformed) text `parts`
+  return parts[0][:0].join(parts) if parts else b''
+
+#------------------------------------------------------------------------------
+def _byteview(buf):
+  view = memoryview(buf)
+  if view.ndim != 1 or view.itemsize != 1:
+    view = view.cast('B')
+  return view
+
+
+#------------------------------------------------------------------------------
+class AssetGroupStream(io.RawIOBase):
+  '''
+  A read-only, non-seekable raw stream over the concatenated content
+  of all the assets in an :class:`AssetGroup`. Each asset's stream is
+  opened when it is reached and closed as soon as it is exhausted.
+  '''
   def __init__(self, group):
+    super(AssetGroupStream, self).__init__()
     self.group  = group
     self.assets = iter(group)
     self._cur   = None
-  def read(self, size=-1):
-    ret = b'' if self._cur is None else self._cur.read(size)
-    if size >= 0 and len(ret) >= size:
-      return ret
-    while True:
-      try:
-        self._cur = six.next(self.assets)
-      except StopIteration:
-        self._cur = None
-        return ret
-      ret += self._cur.read(( size - len(ret) ) if size > 0 else -1)
-      if size >= 0 and len(ret) >= size:
-        return ret
-  def readline(self):
-    if self._cur is None:
+    self._done  = False
+    self._pos   = 0
+  def _next(self):
+    if self._cur is not None:
+      self._cur.close()
+      self._cur = None
+    if not self._done:
       try:
-        self._cur = six.next(self.assets)
+        self._cur = six.next(self.assets).stream()
       except StopIteration:
-        self._cur = None
-        return b''
+        self._done = True
+    return self._cur
+  def readable(self):
+    return True
+  def tell(self):
+    _checkopen(self)
+    return self._pos
+  def _remaining(self):
+    # returns the total size of the group if nothing has been read yet
+    # and every asset's size is known from the backend, otherwise None.
+    # the size of transformed content is never known in advance.
+    if self._pos or self._cur is not None or self._done \
+        or self.group.transformer is not None:
+      return None
+    return self.group.total_size()
+  def read(self, size=-1):
+    _checkopen(self)
+    if size is None or size < 0:
+      return self.readall()
+    if self.group.transformer is not None:
+      # transformers may produce text, so the chunks are collected as-is
+      parts = []
+      while size > 0:
+        if self._cur is None and self._next() is None:
+          break
+        data = self._cur.read(size)
+        if not data:
+          self._next()
+          continue
+        self._pos += len(data)
+        size -= len(data)
+        parts.append(data)
+      return _join(parts)
+    buf   = bytearray(size)
+    count = self.readinto(buf)
+    return bytes(buf if count == size else buf[:count])
+  def readall(self):
+    _checkopen(self)
+    # note: the content is collected into a single preallocated buffer
+    #       when the total size is known (and otherwise into a list of
+    #       parts that is joined once) so that reading an entire group
+    #       is linear in the total size.
+    parts = []
+    total = self._remaining()
+    if total:
+      buf   = bytearray(total)
+      count = self.readinto(buf)
+      if count < total:
+        del buf[count:]
+      parts.append(buf)
+    while self._cur is not None or self._next() is not None:
+      data = self._cur.read()
+      self._pos += len(data)
+      parts.append(data)
+      self._next()
+    if self.group.transformer is not None:
+      return _join(parts)
+    return b''.join(parts)
+  def readinto(self, buf):
+    _checkopen(self)
+    view  = _byteview(buf)
+    total = 0
+    while total < len(view):
+      if self._cur is None and self._next() is None:
+        break
+      count = self._cur.readinto(view[total:])
+      if not count:
+        self._next()
+        continue
+      total += count
+    self._pos += total
+    return total
+  def readline(self, size=-1):
+    _checkopen(self)
     while True:
-      ret = self._cur.readline()
+      if self._cur is None and self._next() is None:
+        return b''
+      ret = self._cur.readline(size)
       if ret:
+        self._pos += len(ret)
         return ret
-      try:
-        self._cur = six.next(self.assets)
-      except StopIteration:
-        self._cur = None
-        return b''
+      self._next()
   def chunks(self, *args, **kws):
     return chunks(self, *args, **kws)
   def close(self):
-    pass
-  def __iter__(self):
-    while True:
-      line = self.readline()
-      if not line:
-        return
-      yield line
+    if getattr(self, '_cur', None) is not None:
+      self._cur.close()
+      self._cur = None
+    super(AssetGroupStream, self).close()
 
 
 #------------------------------------------------------------------------------
 class AssetGroup(object):
   # TODO: implement all expected file-like methods...
-  def __init__(self, package, package_dir, regex, spec):
+  def __init__(self, package, package_dir, regex, spec, prune=None,
+               transformer=None, variants=True, parts=None,
+               limit=None, order='sorted'):
     # todo: remove `package_dir` -- it should be inferred...
     self.package = package
     self.pkgdir  = package_dir
     self.regex   = regex
     self.spec    = spec
+    self.prune   = prune
+    self.transformer = transformer
+    self.variants = variants
+    self._parts  = parts
+    self.limit   = limit
+    self.order   = order
     self._fp     = None
+    self._names  = None
+  @property
+  def parts(self):
+    # the (package, pkgdir, regex, prune) of each package that is walked
+    # (once, in order) to resolve the matches; only groups created from
+    # multiple patterns have more than one.
+    return self._parts or ((self.package, self.pkgdir, self.regex, self.prune),)
   def peek(self):
     for pkg, res in self.resources():
       return self
@@ -106,19 +226,40 @@ class AssetGroup(object):
       return True
     except NoSuchAsset:
       return False
-  def resources(self):
-    count = 0
-    for resource in listres(self.package, self.pkgdir):
-      if not self.regex.match(resource):
-        continue
-      count += 1
-      yield (self.package, resource)
-    if count <= 0:
+  def refresh(self):
+    '''
+    Discards the resolved list of matching resources, so that the next
+    access re-evaluates the pattern against the package.
+    '''
+    self._names = None
+    return self
+  def _resolve(self):
+    # the matches are resolved once, on first access, and then shared
+    # by all accessors until `refresh()` is called.
+    # the walk is closed explicitly so that stopping early (see `limit`)
+    # releases any open directory listings immediately.
+    if self._names is None:
+      names = self._iter()
+      try:
+        self._names = tuple(itertools.islice(names, self.limit))
+      finally:
+        names.close()
+    if not self._names:
       raise NoSuchAsset('No asset matched "%s"' % (self.spec,))
+    return self._names
+  def _iter(self):
+    # lazily generates the (package, name) of each match
+    for package, pkgdir, regex, prune in self.parts:
+      idx = None if self.variants else index.get(package)
+      for name in listres(package, pkgdir, prune=prune, order=self.order):
+        if regex.match(name) and ( idx is None or not _isvariant(idx, name) ):
+          yield (package, name)
+  def resources(self):
+    return iter(self._resolve())
   def chunks(self, *args, **kws):
     return self._stream().chunks(*args, **kws)
   def __len__(self):
-    return len(list(self.resources()))
+    return len(self._resolve())
   def __iter__(self):
     for pkg, res in self.resources():
       yield Asset(self, pkg, res)
@@ -130,30 +271,210 @@ class AssetGroup(object):
     return self._fp
   def read(self, size=-1):
     return self._stream().read(size)
+  def readinto(self, buf):
+    return self._stream().readinto(buf)
   def readline(self):
     return self._stream().readline()
+  def map(self, func, max_workers=None, max_bytes=None):
+    return _pmap(func, self, max_workers=max_workers, max_bytes=max_bytes)
+  def read_all(self, max_workers=None, max_bytes=None):
+    return list(self.map(
+      _readall, max_workers=max_workers, max_bytes=max_bytes))
+  def stat(self):
+    '''
+    Returns an aadict summary of the (untransformed) assets in this
+    group, computed in a single pass over the matches without reading
+    any content: the `count` of assets, their total `size` in bytes
+    and the latest `mtime`. The `size` and `mtime` are ``None`` if
+    they cannot be determined for every asset.
+    '''
+    ret = aadict(count=0, size=0, mtime=0)
+    for pkg, res in self.resources():
+      ret.count += 1
+      st = backend.get(pkg).stat(res)
+      if st is None:
+        ret.size = ret.mtime = None
+      elif ret.size is not None:
+        ret.size += st.size
+        ret.mtime = max(ret.mtime, st.mtime)
+    return ret
+  def total_size(self):
+    '''
+    Returns the total size, in bytes, of the assets in this group, or
+    ``None`` if it cannot be determined without reading them.
+    '''
+    return self.stat().size
+  def copyto(self, dest):
+    '''
+    Writes the content of all the assets in this group, in order, to
+    `dest` (see :func:`copyto`). Returns the number of bytes written.
+    '''
+    return sum(item.copyto(dest) for item in self)
+  def digest(self, algo='sha256'):
+    '''
+    Returns a hex digest that identifies the combined content of all
+    the assets in this group, computed over the (ordered) names and
+    content digests (see :meth:`Asset.digest`) of each asset.
+    '''
+    ret = hashlib.new(algo)
+    for pkg, res in self.resources():
+      ret.update(res.encode('utf-8') + b'\0')
+      ret.update(cache.digest(pkg, res, algo).encode('ascii') + b'\n')
+    return ret.hexdigest()
+  # asyncio support (see `asset.aio`)...
+  def aread(self, size=-1):
+    from . import aio
+    return aio.aread(self, size)
+  def achunks(self, *args, **kws):
+    from . import aio
+    return aio.achunks(self, *args, **kws)
+  def __aiter__(self):
+    from . import aio
+    return aio.aassets(self)
 
 
 #------------------------------------------------------------------------------
-class AssetStream(object):
-  # TODO: implement all expected file-like methods...
+class AssetStream(io.RawIOBase):
+  '''
+  A read-only raw stream over the content of a single :class:`Asset`
+  that wraps the backend's stream. It is seekable if the backend's
+  stream is, and closing it closes the backend's stream.
+  '''
   def __init__(self, stream, asset):
+    super(AssetStream, self).__init__()
     self.stream = stream
     self.asset  = asset
+  def readable(self):
+    return True
+  def seekable(self):
+    _checkopen(self)
+    seekable = getattr(self.stream, 'seekable', None)
+    return bool(seekable and seekable())
+  def seek(self, offset, whence=io.SEEK_SET):
+    if not self.seekable():
+      raise io.UnsupportedOperation('seek')
+    return self.stream.seek(offset, whence)
+  def tell(self):
+    _checkopen(self)
+    return self.stream.tell()
+  def fileno(self):
+    fileno = getattr(self.stream, 'fileno', None)
+    if fileno is None:
+      raise io.UnsupportedOperation('fileno')
+    return fileno()
   def read(self, size=-1):
-    return self.stream.read(size)
-  def readline(self):
-    return self.stream.readline()
+    _checkopen(self)
+    return self.stream.read(-1 if size is None else size)
+  def readall(self):
+    return self.read()
+  def readinto(self, buf):
+    _checkopen(self)
+    readinto = getattr(self.stream, 'readinto', None)
+    if readinto is not None:
+      return readinto(buf)
+    view = _byteview(buf)
+    data = self.stream.read(len(view))
+    view[:len(data)] = data
+    return len(data)
+  def readline(self, size=-1):
+    _checkopen(self)
+    return self.stream.readline(size)
   def close(self):
-    pass
+    if not self.closed:
+      try:
+        self.stream.close()
+      finally:
+        super(AssetStream, self).close()
   def chunks(self, *args, **kws):
-    return chunks(self.stream, *args, **kws)
-  def __iter__(self):
-    while True:
-      line = self.readline()
-      if not line:
-        return
-      yield line
+    return chunks(self, *args, **kws)
+
+
+#------------------------------------------------------------------------------
+class TransformerStream(io.RawIOBase):
+  '''
+  A read-only, non-seekable raw stream over the output of applying a
+  `transformer` (see :mod:`asset.transform`) to the content of an
+  :class:`Asset`. The content is pulled through the transformer one
+  chunk at a time as the stream is read. If the transformer produces
+  text (instead of bytes) chunks, then `read` and `readline` return
+  text as well.
+  '''
+  def __init__(self, stream, transformer, asset):
+    super(TransformerStream, self).__init__()
+    self.stream  = stream
+    self.asset   = asset
+    self._output = iter(transformer(chunks(stream)))
+    self._buf    = None
+    self._empty  = b''
+  def _next(self):
+    # returns the current (unconsumed) output chunk, or None at EOF
+    while not self._buf:
+      if self._output is None:
+        return None
+      try:
+        self._buf = six.next(self._output)
+      except StopIteration:
+        self._output = None
+        return None
+      self._empty = self._buf[:0]
+    return self._buf
+  def _take(self, size):
+    ret = self._buf[:size]
+    self._buf = self._buf[size:]
+    return ret
+  def readable(self):
+    return True
+  def read(self, size=-1):
+    _checkopen(self)
+    if size is None or size < 0:
+      return self.readall()
+    parts = []
+    while size > 0 and self._next() is not None:
+      parts.append(self._take(size))
+      size -= len(parts[-1])
+    return self._empty.join(parts)
+  def readall(self):
+    _checkopen(self)
+    parts = []
+    while self._next() is not None:
+      parts.append(self._take(len(self._buf)))
+    return self._empty.join(parts)
+  def readinto(self, buf):
+    view = _byteview(buf)
+    data = self.read(len(view))
+    view[:len(data)] = data
+    return len(data)
+  def readline(self, size=-1):
+    _checkopen(self)
+    parts = []
+    while size != 0 and self._next() is not None:
+      idx = self._buf.find(b'\n' if isinstance(self._buf, bytes) else '\n')
+      end = len(self._buf) if idx < 0 else idx + 1
+      if size > 0:
+        end = min(end, size)
+        size -= end
+      parts.append(self._take(end))
+      if idx >= 0 and idx < end:
+        break
+    return self._empty.join(parts)
+  def chunks(self, size=None):
+    if size is not None:
+      return chunks(self, size)
+    return self._chunks()
+  def _chunks(self):
+    # yields the transformer's output chunks as-is
+    while self._next() is not None:
+      yield self._take(len(self._buf))
+  def close(self):
+    if not self.closed:
+      try:
+        close = getattr(self._output, 'close', None)
+        if close is not None:
+          close()
+        self._output = None
+        self.stream.close()
+      finally:
+        super(TransformerStream, self).close()
 
 
 #------------------------------------------------------------------------------
@@ -166,22 +487,121 @@ class Asset(object):
     self.package = package
     self.name    = name
     self._fp     = None
+    self._buf    = None
   def __str__(self):
     return '%s:%s' % (self.package, self.name)
+  @property
+  def transformer(self):
+    return self.group.transformer
+  @property
+  def size(self):
+    '''
+    The size, in bytes, of this asset's (untransformed) content, as
+    reported by the package's backend without reading it, i.e. from
+    ``os.stat`` or the zip archive's directory. ``None`` if unknown.
+    '''
+    st = backend.get(self.package).stat(self.name)
+    return None if st is None else st.size
+  @property
+  def mtime(self):
+    '''
+    The modification time (as epoch seconds) of this asset, or
+    ``None`` if unknown.
+    '''
+    st = backend.get(self.package).stat(self.name)
+    return None if st is None else st.mtime
   def stream(self):
-    return AssetStream(
-      pkg_resources.resource_stream(self.package, self.name), self)
+    data = cache.fetch(self.package, self.name)
+    if data is not None:
+      stream = AssetStream(io.BytesIO(data), self)
+    else:
+      stream = AssetStream(backend.get(self.package).open(self.name), self)
+    if self.transformer is None:
+      return stream
+    return TransformerStream(stream, self.transformer, self)
   def _stream(self):
     if self._fp is None:
       self._fp = self.stream()
     return self._fp
   def read(self, size=-1):
     return self._stream().read(size)
+  def readinto(self, buf):
+    return self._stream().readinto(buf)
   def readline(self):
     return self._stream().readline()
+  def digest(self, algo='sha256'):
+    '''
+    Returns the hex digest of this asset's (untransformed) content
+    using the hashlib hash `algo`, e.g. for use as an HTTP ETag.
+    Digests are memoized (and taken from the package's asset manifest,
+    if available), so repeated calls do not re-read the content.
+    '''
+    return cache.digest(self.package, self.name, algo)
+  def read_range(self, offset, length):
+    '''
+    Returns (at most) `length` bytes of this asset's content starting
+    at byte `offset`, e.g. to serve HTTP Range requests. The content
+    before `offset` is not read (nor, for zipped packages, generally
+    decompressed), unless the asset has a transformer, in which case
+    the transformed content is read up to `offset` and discarded.
+    Raises ValueError if `offset` or `length` is negative.
+    '''
+    if offset < 0 or length < 0:
+      raise ValueError(
+        'invalid range: offset %r, length %r' % (offset, length))
+    if self.transformer is not None:
+      with self.stream() as stream:
+        while offset > 0:
+          buf = stream.read(min(offset, MAXBUF * 8))
+          if not buf:
+            break
+          offset -= len(buf)
+        return stream.read(length)
+    data = cache.fetch(self.package, self.name)
+    if data is not None:
+      return bytes(data[offset:offset + length])
+    return backend.get(self.package).read_range(self.name, offset, length)
+  def variant(self, accept):
+    '''
+    Returns a tuple of ``(asset, encoding)`` for the best precompressed
+    variant of this asset, i.e. the first content-coding in `accept`
+    (e.g. ``['br', 'gzip']``) for which a sibling file with the
+    corresponding suffix (see :data:`ENCODINGS`) exists, such as
+    ``style.css.br`` for ``style.css``. If there is no such variant,
+    ``(self, None)`` is returned. The variants are looked up in the
+    resource index, i.e. without any additional filesystem probes.
+    '''
+    suffixes = [ENCODINGS[enc] for enc in accept if enc in ENCODINGS]
+    suffix   = index.get(self.package).sibling(self.name, suffixes)
+    if suffix is None:
+      return (self, None)
+    enc = next(enc for enc in accept if ENCODINGS.get(enc) == suffix)
+    return (Asset(self.group, self.package, self.name + suffix), enc)
+  def copyto(self, dest):
+    '''
+    Writes this asset's content to `dest` (see :func:`copyto`) and
+    returns the number of bytes written.
+    '''
+    with self.stream() as stream:
+      return copyto(stream, dest)
+  def buffer(self):
+    '''
+    Returns a read-only ``memoryview`` of this asset's content without
+    copying it. For packages installed as directories, the view is
+    backed by a memory-map of the file; otherwise, the content is read
+    once and kept for the lifetime of this Asset (as is the output of
+    the transformer, if there is one).
+    '''
+    if self._buf is None:
+      if self.transformer is not None:
+        with self.stream() as stream:
+          self._buf = memoryview(stream.read())
+      else:
+        self._buf = backend.get(self.package).buffer(self.name)
+    return self._buf
   # compatibility with AssetGroup() API...
   def peek(self):
-    if pkg_resources.resource_exists(self.package, self.name):
+    if index.get(self.package).exists(self.name):
       return self
     raise NoSuchAsset('No asset matched "%s:%s"' % (self.package, self.name))
   def count(self):
@@ -197,6 +617,28 @@ class Asset(object):
     yield (self.package, self.name)
   def chunks(self, *args, **kws):
     return self._stream().chunks(*args, **kws)
+  def map(self, func, max_workers=None, max_bytes=None):
+    return _pmap(func, self, max_workers=max_workers, max_bytes=max_bytes)
+  def read_all(self, max_workers=None, max_bytes=None):
+    return list(self.map(
+      _readall, max_workers=max_workers, max_bytes=max_bytes))
+  def stat(self):
+    self.peek()
+    st = backend.get(self.package).stat(self.name)
+    if st is None:
+      return aadict(count=1, size=None, mtime=None)
+    return aadict(count=1, size=st.size, mtime=st.mtime)
+  def total_size(self):
+    return self.stat().size
+  def aread(self, size=-1):
+    from . import aio
+    return aio.aread(self, size)
+  def achunks(self, *args, **kws):
+    from . import aio
+    return aio.achunks(self, *args, **kws)
+  def __aiter__(self):
+    from . import aio
+    return aio.aassets(self)
   def __len__(self):
     self.peek()
     return 1
@@ -207,10 +649,19 @@ class Asset(object):
     return '<asset "{}:{}">'.format(self.package, self.name)
   @property
   def filename(self):
-    prov = pkg_resources.get_provider(self.package)
-    if isinstance(prov, pkg_resources.ZipProvider):
-      return None
-    return pkg_resources.resource_filename(self.package, self.name)
+    return backend.get(self.package).filename(self.name)
+  def path(self, extract=True):
+    '''
+    Returns a filesystem path to this asset's (untransformed) content.
+    If the asset is not a plain file (e.g. it is in a zipped package),
+    it is extracted on demand into a shared, content-addressed cache
+    directory (see :func:`asset.cache.extract`), unless `extract` is
+    falsy, in which case ``None`` is returned.
+    '''
+    ret = self.filename
+    if ret is None and extract:
+      ret = cache.extract(self.package, self.name)
+    return ret
 
 
 defaultExclude = ('.rcs', '.svn', '.git', '.hg')
@@ -219,33 +670,110 @@ defaultExclude = ('.rcs', '.svn', '.git', '.hg')
 def listres(pkgname, pkgdir,
             recursive=True, depthFirst=False,
             exclude=defaultExclude, showDirs=False,
+            prune=None, order='sorted',
             ):
-  reslist = [os.path.join(pkgdir, cur)
-             for cur in pkg_resources.resource_listdir(pkgname, pkgdir)
-             if cur not in exclude]
+  '''
+  Generates the names of all resources in package `pkgname` under
+  the package directory `pkgdir`. If `prune` is specified, it must be
+  a callable that is passed each directory name before it is
+  descended into; if it returns truthy, that subtree is skipped.
+
+  If `order` is ``'any'``, each directory listing is streamed directly
+  from the package backend, unsorted and without being cached or
+  buffered (sub-directories are descended into as they are found),
+  which allows a caller that stops early to avoid reading the rest of
+  a large directory.
+  '''
+  if order == 'any':
+    entries    = backend.get(pkgname).listdir(pkgdir)
+    depthFirst = True
+  elif order == 'sorted':
+    entries    = index.get(pkgname).listdir(pkgdir)
+  else:
+    raise ValueError('unknown listing order %r' % (order,))
   dirs = []
-  for cur in sorted(reslist):
-    if pkg_resources.resource_isdir(pkgname, cur):
+  for cur, isdir in entries:
+    if cur in exclude:
+      continue
+    cur = os.path.join(pkgdir, cur)
+    if isdir:
       if showDirs:
         yield cur + '/'
-      if recursive:
+      if recursive and not ( prune and prune(cur) ):
         if depthFirst:
-          for subcur in listres(pkgname, cur):
+          for subcur in listres(pkgname, cur, prune=prune, order=order):
             yield subcur
         else:
           dirs.append(cur)
     else:
       yield cur
   for cur in dirs:
-    for subcur in listres(pkgname, cur):
+    for subcur in listres(pkgname, cur, prune=prune, order=order):
       yield subcur
 
 #------------------------------------------------------------------------------
-def load(pattern, *args, **kws):
+def _isvariant(idx, name):
+  for suffix in ENCODINGS.values():
+    if name.endswith(suffix) and idx.lookup(name[:-len(suffix)]) is False:
+      return True
+  return False
+
+#------------------------------------------------------------------------------
+def globprune(pattern):
+  '''
+  Returns a callable that, given a directory path, returns truthy if
+  no resource below that directory can match the glob `pattern`. The
+  pattern is decomposed into path segments, and each directory path
+  component is matched against its corresponding segment up until the
+  first segment that could span directories (i.e. ``**``, ``{...}``
+  regex inlines, or a range that contains a ``/``). Returns ``None`` if
+  the pattern does not allow any pruning.
+  '''
+  segs = []
+  cur  = ''
+  for token in globre.Tokenizer(pattern).tokens():
+    ttype, value = token[:2]
+    if ttype == globre.Tokenizer.LITERAL:
+      parts = value.split('/')
+      cur += re.escape(parts[0])
+      for part in parts[1:]:
+        segs.append(cur)
+        cur = re.escape(part)
+    elif ttype == globre.Tokenizer.SINGLE:
+      cur += '[^/]'
+    elif ttype == globre.Tokenizer.MULTIPLE:
+      cur += '[^/]*'
+    elif ttype == globre.Tokenizer.RANGE and '/' not in value:
+      cur += '[' + value + ']'
+    else:
+      cur = None
+      break
+  bounded = cur is not None
+  if bounded:
+    segs.append(cur)
+  if not segs:
+    return None
+  segs = [re.compile('^' + seg + '$') for seg in segs]
+  def _prune(path):
+    comps = path.split('/')
+    if bounded and len(comps) >= len(segs):
+      return True
+    for comp, seg in zip(comps, segs):
+      if not seg.match(comp):
+        return True
+    return False
+  return _prune
+
+#------------------------------------------------------------------------------
+def load(pattern, transformer=None, variants=True, exclude=None,
+         limit=None, order='sorted'):
   '''
   Given a package asset-spec glob-pattern `pattern`, returns an
   :class:`AssetGroup` object, which in turn can act as a generator of
-  :class:`Asset` objects that match the pattern.
+  :class:`Asset` objects that match the pattern. If `pattern` is a
+  list of patterns, a single group of all the (de-duplicated) assets
+  that match any of them is returned; the patterns are combined so
+  that each package is only walked once.
 
   Example:
 
@@ -256,27 +784,187 @@ def load(pattern, *args, **kws):
     # concatenate all 'css' files into one string:
     css = asset.load('mypackage:static/style/**.css').read()
 
-  NOTE: currently, any extra parameters and keywords beyond `pattern`
-  are ignored.
+    # decompress all gzipped files as they are read:
+    data = asset.load('mypackage:data/*.gz', transformer='gunzip').read()
+
+    # all stylesheets and scripts, except for the vendored ones:
+    static = asset.load(
+      ['mypackage:static/**.css', 'mypackage:static/**.js'],
+      exclude='mypackage:static/vendor/**')
+
+  :Parameters:
+
+  transformer : callable | str | list; default: null
+
+    A streaming transformer that is applied to the content of each
+    matching asset as it is read, either a callable, the spec of
+    plugins registered in the ``asset.transformers`` group or a list
+    of either (see :mod:`asset.transform`).
+
+  variants : bool; default: true
+
+    If falsy, precompressed variants of other assets (e.g. the file
+    ``style.css.gz`` if ``style.css`` exists, see :meth:`Asset.variant`)
+    are excluded from the matches.
+
+  exclude : str | list; default: null
+
+    Pattern(s) of assets to exclude from the matches. Patterns without
+    a "PACKAGE:" prefix apply to all packages. Directories matched by
+    an exclude pattern ending in ``/**`` are not walked at all.
+
+  limit : int; default: null
+
+    The maximum number of matches; the walk stops as soon as `limit`
+    assets have been found.
+
+  order : str; default: 'sorted'
+
+    The order of the matches: ``'sorted'`` (i.e. by name, within each
+    directory) or ``'any'``, which streams the directory listings
+    directly from the package without sorting them, e.g. for fast
+    "first match" lookups in huge directories.
   '''
-  # todo: why are `args` and `kws` being ignored?...
+  if order not in ('sorted', 'any'):
+    raise ValueError('unknown listing order %r' % (order,))
+  transformer = transform.resolve(transformer)
+  if isstr(pattern) and not exclude:
+    spec  = _compile(pattern)
+    group = AssetGroup(
+      spec.package, spec.pkgdir, spec.regex, pattern, prune=spec.prune,
+      transformer=transformer, variants=variants, limit=limit, order=order)
+    if spec.wild:
+      return group
+    return Asset(group, spec.package, spec.glob)
+  parts = _compileall(
+    [pattern] if isstr(pattern) else pattern,
+    [exclude] if isstr(exclude) else exclude or [])
+  return AssetGroup(
+    parts[0][0], parts[0][1], parts[0][2], pattern, prune=parts[0][3],
+    transformer=transformer, variants=variants, parts=parts,
+    limit=limit, order=order)
+
+#------------------------------------------------------------------------------
+class _Spec(object):
+  __slots__ = ('package', 'glob', 'pkgdir', 'regex', 'wild', 'prune')
+  def __init__(self, package, glob, pkgdir, regex, wild, prune):
+    self.package = package
+    self.glob    = glob
+    self.pkgdir  = pkgdir
+    self.regex   = regex
+    self.wild    = wild
+    self.prune   = prune
+
+_specs = LRUCache(MAXSPECS)
 
-  spec = pattern
+#------------------------------------------------------------------------------
+def _compile(pattern):
+  spec = _specs.get(pattern)
+  if spec is not None:
+    return spec
 
   if ':' not in pattern:
     raise ValueError('`pattern` must be in the format "PACKAGE:GLOB"')
 
   pkgname, pkgpat = pattern.split(':', 1)
-  pkgdir, pattern = globre.compile(pkgpat, split_prefix=True, flags=globre.EXACT)
+  pkgdir, regex = globre.compile(pkgpat, split_prefix=True, flags=globre.EXACT)
 
   if pkgdir:
     idx = pkgdir.rfind('/')
     pkgdir = pkgdir[:idx] if idx >= 0 else ''
 
-  group = AssetGroup(pkgname, pkgdir, pattern, spec)
-  if globre.iswild(pkgpat):
-    return group
-  return Asset(group, pkgname, pkgpat)
+  return _specs.put(pattern, _Spec(
+    pkgname, pkgpat, pkgdir, regex, globre.iswild(pkgpat), globprune(pkgpat)))
+
+#------------------------------------------------------------------------------
+def _compileall(patterns, excludes):
+  # returns the (package, pkgdir, regex, prune) part of each package
+  # in `patterns`, where the patterns and `excludes` of each package
+  # are combined into a single regex and prune callable.
+  key   = (tuple(patterns), tuple(excludes))
+  parts = _specs.get(key)
+  if parts is not None:
+    return parts
+  if not patterns:
+    raise ValueError('at least one pattern is required')
+  packages = collections.OrderedDict()
+  for pattern in patterns:
+    spec = _compile(pattern)
+    packages.setdefault(spec.package, []).append(spec)
+  excludes = [_compileexclude(pattern) for pattern in excludes]
+  parts = []
+  for package, specs in six.iteritems(packages):
+    excl = [item for item in excludes if item[0] in (None, package)]
+    parts.append((
+      package,
+      _commondir([spec.pkgdir for spec in specs]),
+      _combine([spec.regex for spec in specs], [item[1] for item in excl]),
+      _combineprune(
+        [spec.prune for spec in specs],
+        [item[2] for item in excl if item[2] is not None]),
+    ))
+  return _specs.put(key, tuple(parts))
+
+#------------------------------------------------------------------------------
+def _compileexclude(pattern):
+  # returns (package, regex, dirregex) for the exclude `pattern`, where
+  # `package` is None if it applies to all packages and `dirregex`, if
+  # not None, matches directories whose entire subtree is excluded.
+  package = None
+  if ':' in pattern:
+    package, pattern = pattern.split(':', 1)
+  dirregex = None
+  if pattern.endswith('/**'):
+    dirregex = globre.compile(pattern[:-3], flags=globre.EXACT)
+  return (package, globre.compile(pattern, flags=globre.EXACT), dirregex)
+
+#------------------------------------------------------------------------------
+def _commondir(pkgdirs):
+  parts = [pkgdir.split('/') if pkgdir else [] for pkgdir in pkgdirs]
+  return '/'.join(os.path.commonprefix(parts))
+
+#------------------------------------------------------------------------------
+def _combine(includes, excludes):
+  # combines the `includes` and `excludes` regexes into a single regex
+  # that matches anything that any include matches and no exclude does
+  expr = '|'.join('(?:%s)' % (regex.pattern,) for regex in includes)
+  if excludes:
+    expr = '(?!%s)(?:%s)' % (
+      '|'.join('(?:%s)' % (regex.pattern,) for regex in excludes), expr)
+  return re.compile(expr, includes[0].flags)
+
+#------------------------------------------------------------------------------
+def _combineprune(includes, excludes):
+  # a directory is pruned if it is excluded or if none of the includes
+  # can match anything below it
+  if None in includes:
+    includes = None
+  if includes is None and not excludes:
+    return None
+  def _prune(path):
+    for regex in excludes:
+      if regex.match(path):
+        return True
+    return includes is not None and all(prune(path) for prune in includes)
+  return _prune
+
+#------------------------------------------------------------------------------
+def specstats():
+  '''
+  Returns the counters (hits, misses, evictions, etc) of the cache of
+  compiled `load` specs.
+  '''
+  return _specs.stats()
+
+#------------------------------------------------------------------------------
+def aload(pattern, *args, **kws):
+  '''
+  Asynchronous version of :func:`load`, i.e. ``await aload(pattern)``
+  returns the same as ``load(pattern)``, but any blocking work is done
+  on the executor configured with :func:`asset.aio.setexecutor`.
+  '''
+  from . import aio
+  return aio.aload(pattern, *args, **kws)
 
 #------------------------------------------------------------------------------
 def exists(pattern, *args, **kws):
@@ -293,6 +981,143 @@ def exists(pattern, *args, **kws):
   '''
   return load(pattern, *args, **kws).exists()
 
+#------------------------------------------------------------------------------
+def _readall(item):
+  with item.stream() as stream:
+    return stream.read()
+
+#------------------------------------------------------------------------------
+def _pmap(func, assets, max_workers=None, max_bytes=None):
+  '''
+  Generates the return values of calling `func` with each asset in
+  `assets`, in order, where the calls are executed concurrently on a
+  pool of (at most) `max_workers` threads. At most two calls per
+  worker are queued ahead of the consumer and, if `max_bytes` is
+  specified, an asset is only submitted if the total size of all
+  assets that are in flight (i.e. submitted, but whose result has not
+  yet been consumed) would stay within `max_bytes` (or if there are
+  no other assets in flight).
+  '''
+  from concurrent.futures import ThreadPoolExecutor
+  if max_workers is None:
+    max_workers = min(32, ( os.cpu_count() or 1 ) + 4)
+  pool     = ThreadPoolExecutor(max_workers)
+  window   = 2 * max_workers
+  pending  = collections.deque()
+  inflight = 0
+  try:
+    for item in assets:
+      size = 0
+      if max_bytes is not None:
+        size = backend.get(item.package).size(item.name) or 0
+      while pending and (
+          len(pending) >= window
+          or ( max_bytes is not None and inflight + size > max_bytes )):
+        future, fsize = pending.popleft()
+        inflight -= fsize
+        yield future.result()
+      pending.append((pool.submit(func, item), size))
+      inflight += size
+    while pending:
+      yield pending.popleft()[0].result()
+  finally:
+    for future, fsize in pending:
+      future.cancel()
+    pool.shutdown(wait=True)
+
+#------------------------------------------------------------------------------
+def _fileno(obj):
+  if isinstance(obj, six.integer_types):
+    return obj
+  try:
+    return obj.fileno()
+  except (AttributeError, io.UnsupportedOperation, OSError, ValueError):
+    return None
+
+#------------------------------------------------------------------------------
+def _sendfile(src, dst, offset):
+  # copies `src` (from `offset`) to `dst` in-kernel, returning the
+  # number of bytes copied or ``None`` if neither file descriptor
+  # supports it (in which case nothing was copied).
+  total = 0
+  funcs = []
+  if hasattr(os, 'copy_file_range'):
+    funcs.append(
+      lambda count: os.copy_file_range(src, dst, count, offset + total))
+  if hasattr(os, 'sendfile'):
+    funcs.append(lambda count: os.sendfile(dst, src, offset + total, count))
+  for func in funcs:
+    try:
+      while True:
+        count = func(0x40000000)
+        if not count:
+          return total
+        total += count
+    except OSError as err:
+      if total or err.errno not in (
+          errno.EINVAL, errno.ENOSYS, errno.EXDEV, errno.EBADF,
+          errno.ENOTSUP, errno.EOPNOTSUPP, errno.ESPIPE):
+        raise
+  return None
+
+#------------------------------------------------------------------------------
+def _writeall(write, view):
+  while view:
+    count = write(view)
+    if count is None:
+      raise BlockingIOError(errno.EAGAIN, 'write would block')
+    view = view[count:]
+
+#------------------------------------------------------------------------------
+def copyto(stream, dest):
+  '''
+  Writes the remaining content of `stream` to `dest` and returns the
+  number of bytes written. `dest` can be a file descriptor, a socket
+  or a (binary) file-like object.
+
+  If both `stream` and `dest` are backed by file descriptors (e.g. an
+  asset of a package installed as a directory), the data is copied
+  in-kernel with ``os.copy_file_range`` or ``os.sendfile`` and never
+  passes through Python buffers. Otherwise, the data is copied via a
+  single, reused buffer.
+  '''
+  if hasattr(dest, 'sendfile') and hasattr(dest, 'recv'):
+    # a socket: ``socket.sendfile`` already handles timeouts and falls
+    # back to ``send`` for streams without a file descriptor, but it
+    # starts at `offset` rather than at the stream's current position
+    seekable = getattr(stream, 'seekable', None)
+    offset   = stream.tell() if seekable is not None and seekable() else 0
+    return dest.sendfile(stream, offset)
+  src = _fileno(stream)
+  if src is not None:
+    flush = getattr(dest, 'flush', None)
+    if flush is not None:
+      flush()
+    dst = _fileno(dest)
+    if dst is not None:
+      offset = stream.tell()
+      count  = _sendfile(src, dst, offset)
+      if count is not None:
+        stream.seek(offset + count)
+        seekable = getattr(dest, 'seekable', None)
+        if seekable is not None and seekable():
+          # re-synchronize the file object with its file descriptor
+          dest.seek(os.lseek(dst, 0, os.SEEK_CUR))
+        return count
+  if isinstance(dest, six.integer_types):
+    write = functools.partial(os.write, dest)
+  else:
+    write = dest.write
+  total = 0
+  buf   = bytearray(MAXBUF * 8)
+  view  = memoryview(buf)
+  while True:
+    count = stream.readinto(buf)
+    if not count:
+      return total
+    _writeall(write, view[:count])
+    total += count
+
 #------------------------------------------------------------------------------
 def chunks(stream, size=None):
   '''
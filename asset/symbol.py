@@ -19,13 +19,27 @@
 # along with this program. If not, see http://www.gnu.org/licenses/.
 #------------------------------------------------------------------------------
 
-import pkg_resources, inspect, six
+import six
 
 from .isstr import isstr
 
+#------------------------------------------------------------------------------
+def importlib_metadata():
+  # note: imported on demand, since `importlib.metadata` (and even more
+  #       so `pkg_resources`) is expensive to import.
+  try:
+    from importlib import metadata
+    return metadata
+  except ImportError:
+    return None
+
 #------------------------------------------------------------------------------
 def version(package, default=None):
   try:
+    metadata = importlib_metadata()
+    if metadata is not None:
+      return metadata.version(package)
+    import pkg_resources
     return pkg_resources.get_distribution(package).version
   except:
     return default
@@ -51,6 +65,7 @@ def symbol(spec):
 
 #------------------------------------------------------------------------------
 def caller(ignore=None):
+  import inspect
   if ignore is None:
     ignore = []
   elif isinstance(ignore, basestring):
@@ -19,6 +19,13 @@
 # along with this program. If not, see http://www.gnu.org/licenses/.
 #------------------------------------------------------------------------------
 
+import io
+import gc
+import sys
+import time
+import shutil
+import zipfile
+import tempfile
 import unittest
 import os.path
 import xml.etree.ElementTree as ET
@@ -35,6 +42,40 @@ def isEgg(pkg):
   dist = pkg_resources.get_distribution(pkg)
   return os.path.isfile(dist.location)
 
+#------------------------------------------------------------------------------
+class TempPackage(object):
+  '''
+  Creates a temporary, importable package named `name` with the
+  specified `files` (a dict of relative path => bytes content). If
+  `zipped` is truthy, the package is installed as a zip archive.
+  '''
+  def __init__(self, name, files, zipped=False, compression=zipfile.ZIP_DEFLATED):
+    self.name = name
+    self.root = tempfile.mkdtemp()
+    self.path = os.path.join(self.root, name)
+    if zipped:
+      self.root = os.path.join(self.root, name + '.zip')
+      with zipfile.ZipFile(self.root, 'w', compression) as zfp:
+        zfp.writestr(name + '/__init__.py', b'')
+        for path, data in sorted(files.items()):
+          zfp.writestr(name + '/' + path, data)
+    else:
+      self.write('__init__.py', b'')
+      for path, data in files.items():
+        self.write(path, data)
+    sys.path.insert(0, self.root)
+  def write(self, path, data):
+    path = os.path.join(self.path, path)
+    if not os.path.isdir(os.path.dirname(path)):
+      os.makedirs(os.path.dirname(path))
+    with open(path, 'wb') as fp:
+      fp.write(data)
+  def close(self):
+    sys.path.remove(self.root)
+    sys.modules.pop(self.name, None)
+    asset.invalidate(self.name)
+    shutil.rmtree(os.path.dirname(self.path))
+
 #------------------------------------------------------------------------------
 class TestAsset(unittest.TestCase, pxml.XmlTestMixin):
 
@@ -74,6 +115,38 @@ class TestAsset(unittest.TestCase, pxml.XmlTestMixin):
        b'line-3\n',
        b'sub-file-line-1\n'])
 
+  #----------------------------------------------------------------------------
+  def test_load_speccache(self):
+    spec  = 'asset:test/data/sub*/**.nl'
+    stats = asset.specstats()
+    first = asset.load(spec)
+    self.assertEqual(asset.specstats().misses, stats.misses + 1)
+    second = asset.load(spec)
+    self.assertEqual(asset.specstats().hits, stats.hits + 1)
+    self.assertIsNot(first, second)
+    self.assertIs(first.regex, second.regex)
+    self.assertEqual(
+      [str(ast) for ast in second], ['asset:test/data/subdir/subfile1.nl'])
+
+  #----------------------------------------------------------------------------
+  def test_load_resolve_once(self):
+    pkg = TempPackage('asset_test_resolve', {'data/a.txt': b'a'})
+    try:
+      group = asset.load(pkg.name + ':data/*.txt')
+      stats = asset.index.stats()
+      self.assertTrue(group.exists())
+      self.assertEqual(len(group), 1)
+      self.assertEqual([ast.name for ast in group], ['data/a.txt'])
+      self.assertEqual(
+        asset.index.stats().hits + asset.index.stats().misses,
+        stats.hits + stats.misses + 1)
+      pkg.write('data/b.txt', b'b')
+      asset.invalidate(pkg.name, 'data')
+      self.assertEqual(len(group), 1)
+      self.assertEqual(len(group.refresh()), 2)
+    finally:
+      pkg.close()
+
   #----------------------------------------------------------------------------
   def test_load_single(self):
     loaded = []
@@ -128,6 +201,218 @@ line-2</node>
         'test/data/subdir/subfile1.nl',
       ])
 
+  #----------------------------------------------------------------------------
+  def test_listres_index(self):
+    asset.invalidate('asset')
+    chk = list(asset.listres('asset', 'test/data'))
+    stats = asset.index.stats()
+    self.assertEqual(list(asset.listres('asset', 'test/data')), chk)
+    self.assertEqual(asset.index.stats().hits, stats.hits + 2)
+    self.assertEqual(asset.index.stats().misses, stats.misses)
+    asset.invalidate('asset', 'test/data')
+    self.assertEqual(list(asset.listres('asset', 'test/data')), chk)
+    self.assertEqual(asset.index.stats().misses, stats.misses + 1)
+
+  #----------------------------------------------------------------------------
+  def test_listres_index_mtime(self):
+    pkg = TempPackage('asset_test_index', {'data/a.txt': b'a'})
+    try:
+      self.assertEqual(
+        list(asset.listres(pkg.name, 'data')), ['data/a.txt'])
+      # ensure the directory mtime changes, even on coarse filesystems
+      time.sleep(0.01)
+      pkg.write('data/b.txt', b'b')
+      stat = os.stat(os.path.join(pkg.path, 'data'))
+      os.utime(os.path.join(pkg.path, 'data'), (stat.st_atime, stat.st_mtime + 1))
+      self.assertEqual(
+        list(asset.listres(pkg.name, 'data')), ['data/a.txt', 'data/b.txt'])
+    finally:
+      pkg.close()
+
+  #----------------------------------------------------------------------------
+  def test_backend_dir(self):
+    from asset import backend
+    store = backend.get('asset')
+    self.assertIsInstance(store, backend.DirBackend)
+    generic = backend.Backend('asset')
+    for pkgdir in ('', 'test', 'test/data'):
+      self.assertEqual(
+        sorted(store.listdir(pkgdir)), sorted(generic.listdir(pkgdir)))
+
+  #----------------------------------------------------------------------------
+  def test_backend_zip(self):
+    from asset import backend
+    pkg = TempPackage('asset_test_zip', {
+      'data/a.txt'     : b'a',
+      'data/b.txt'     : b'b',
+      'data/sub/c.txt' : b'c',
+    }, zipped=True)
+    try:
+      self.assertIsInstance(backend.get(pkg.name), backend.ZipBackend)
+      self.assertEqual(
+        list(asset.listres(pkg.name, '', showDirs=True)),
+        ['__init__.py', 'data/', 'data/a.txt', 'data/b.txt',
+         'data/sub/c.txt'])
+      self.assertEqual(
+        [str(ast) for ast in asset.load(pkg.name + ':data/**.txt')],
+        ['asset_test_zip:data/a.txt', 'asset_test_zip:data/b.txt',
+         'asset_test_zip:data/sub/c.txt'])
+      self.assertTrue(asset.load(pkg.name + ':data/sub/c.txt').exists())
+      self.assertTrue(asset.load(pkg.name + ':data/sub').exists())
+      self.assertFalse(asset.load(pkg.name + ':data/nope.txt').exists())
+      self.assertEqual(asset.load(pkg.name + ':data/a.txt').read(), b'a')
+    finally:
+      pkg.close()
+
+  #----------------------------------------------------------------------------
+  def test_stream_zip(self):
+    data = b''.join(b'line-%d\n' % (idx,) for idx in range(100000))
+    pkg = TempPackage('asset_test_zipstream', {'big.txt': data}, zipped=True)
+    try:
+      item = asset.load(pkg.name + ':big.txt')
+      stream = item.stream()
+      self.assertIsInstance(stream.stream, io.BufferedReader)
+      self.assertIsInstance(stream.stream.raw, asset.backend._ZipMemberStream)
+      chunks = list(stream.chunks(4096))
+      self.assertEqual(max(len(chunk) for chunk in chunks), 4096)
+      self.assertEqual(b''.join(chunks), data)
+      self.assertEqual(item.read(), data)
+      # line reads are buffered instead of each reading the archive
+      store = asset.backend.get(pkg.name)
+      calls = []
+      read_range = store.read_range
+      def _read_range(*args):
+        calls.append(args)
+        return read_range(*args)
+      store.read_range = _read_range
+      try:
+        lines = list(asset.load(pkg.name + ':big.txt').stream())
+      finally:
+        del store.read_range
+      self.assertEqual(len(lines), 100000)
+      self.assertEqual(lines[-1], b'line-99999\n')
+      self.assertLess(len(calls), len(data) // 1024)
+      with asset.load(pkg.name + ':big.txt').stream() as stream:
+        stream.seek(7)
+        self.assertEqual(stream.readline(), b'line-1\n')
+        buf = bytearray(7)
+        self.assertEqual(stream.readinto(buf), 7)
+        self.assertEqual(bytes(buf), b'line-2\n')
+    finally:
+      pkg.close()
+
+  #----------------------------------------------------------------------------
+  def test_backend_resources(self):
+    import importlib.resources
+    from asset import backend
+    store = backend.ResourcesBackend(
+      'asset', importlib.resources.files('asset'))
+    self.assertEqual(
+      sorted(store.listdir('test/data')),
+      sorted(backend.get('asset').listdir('test/data')))
+    with store.open('test/data/file1.nl') as fp:
+      self.assertEqual(fp.read(), b'line-1\nline-2')
+
+  #----------------------------------------------------------------------------
+  def test_lazy_pkg_resources(self):
+    import subprocess
+    script = (
+      'import sys, asset\n'
+      'asset.load("asset:test/data/**.nl").read()\n'
+      'asset.load("asset:test/data/file1.nl").filename\n'
+      'asset.version("pxml")\n'
+      'sys.exit(int("pkg_resources" in sys.modules))\n')
+    self.assertEqual(
+      subprocess.call(
+        [sys.executable, '-c', script],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+      0)
+
+  #----------------------------------------------------------------------------
+  def test_buffer(self):
+    item = asset.load('asset:test/data/file1.nl')
+    buf  = item.buffer()
+    self.assertTrue(buf.readonly)
+    self.assertEqual(buf.tobytes(), b'line-1\nline-2')
+    self.assertIs(item.buffer(), buf)
+    pkg = TempPackage('asset_test_zipbuffer', {
+      'a.bin': b'\x00\x01\x02', 'empty.bin': b''}, zipped=True)
+    try:
+      buf = asset.load(pkg.name + ':a.bin').buffer()
+      self.assertTrue(buf.readonly)
+      self.assertEqual(buf.tobytes(), b'\x00\x01\x02')
+      self.assertEqual(asset.load(pkg.name + ':empty.bin').buffer().tobytes(), b'')
+    finally:
+      pkg.close()
+
+  #----------------------------------------------------------------------------
+  def test_manifest(self):
+    import hashlib
+    from asset import backend, manifest
+    pkg = TempPackage('asset_test_manifest', {
+      'data/a.txt': b'a', 'data/sub/b.txt': b'bb'})
+    try:
+      chk = list(asset.listres(pkg.name, '', showDirs=True))
+      manifest.write(pkg.path)
+      asset.invalidate(pkg.name)
+      store = backend.get(pkg.name)
+      self.assertIsInstance(store, backend.ManifestBackend)
+      self.assertEqual(list(asset.listres(pkg.name, '', showDirs=True)), chk)
+      self.assertEqual(store.size('data/sub/b.txt'), 2)
+      self.assertEqual(
+        store.entry('data/a.txt')[3], hashlib.sha256(b'a').hexdigest())
+      # the manifest, not the filesystem, is authoritative
+      pkg.write('data/c.txt', b'c')
+      self.assertEqual(len(asset.load(pkg.name + ':data/*.txt')), 1)
+      self.assertFalse(asset.load(pkg.name + ':data/c.txt').exists())
+      self.assertEqual(asset.load(pkg.name + ':data/a.txt').read(), b'a')
+    finally:
+      pkg.close()
+
+  #----------------------------------------------------------------------------
+  def test_manifest_command(self):
+    from setuptools.dist import Distribution
+    from asset import build, manifest
+    pkg = TempPackage('asset_test_manifestcmd', {'data/a.txt': b'a'})
+    try:
+      dist = Distribution(dict(name='test', packages=[pkg.name, 'nosuchpkg']))
+      cmd  = build.asset_manifest(dist)
+      cmd.build_lib = pkg.root
+      cmd.no_hashes = True
+      cmd.ensure_finalized()
+      cmd.run()
+      with open(os.path.join(pkg.path, manifest.FILENAME), 'rb') as fp:
+        data = manifest.load(fp)
+      self.assertIsNone(data['hash'])
+      self.assertEqual(data['dirs']['data']['a.txt'][:2], [False, 1])
+    finally:
+      pkg.close()
+
+  #----------------------------------------------------------------------------
+  def test_globprune(self):
+    prune = asset.globprune('static/*/img/*.png')
+    self.assertFalse(prune('static/foo'))
+    self.assertFalse(prune('static/foo/img'))
+    self.assertTrue(prune('static/foo/css'))
+    self.assertTrue(prune('static/foo/img/sub'))
+    prune = asset.globprune('static/**.css')
+    self.assertFalse(prune('static/foo/bar'))
+    self.assertTrue(prune('other'))
+    self.assertIsNone(asset.globprune('**.css'))
+
+  #----------------------------------------------------------------------------
+  def test_load_pruned(self):
+    seen = []
+    group = asset.load('asset:test/*/file1.nl')
+    prune = group.prune
+    def _prune(path):
+      seen.append(path)
+      return prune(path)
+    group.prune = _prune
+    self.assertEqual(
+      [str(ast) for ast in group], ['asset:test/data/file1.nl'])
+    self.assertEqual(seen, ['test/data', 'test/data/subdir'])
+
   #----------------------------------------------------------------------------
   def test_filename_egg(self):
     # NOTE: this requires that `pxml` be installed as a zipped egg, i.e.:
@@ -178,6 +463,591 @@ line-2</node>
     for line in stream:
       self.assertEqual(line, chk.pop())
 
+  #----------------------------------------------------------------------------
+  def test_stream_io(self):
+    import io
+    import hashlib
+    with asset.load('asset:test/data/file1.nl').stream() as stream:
+      self.assertIsInstance(stream, io.RawIOBase)
+      self.assertTrue(stream.readable())
+      self.assertTrue(stream.seekable())
+      buf = bytearray(4)
+      self.assertEqual(stream.readinto(buf), 4)
+      self.assertEqual(bytes(buf), b'line')
+      self.assertEqual(stream.tell(), 4)
+      stream.seek(7)
+      self.assertEqual(stream.read(), b'line-2')
+      inner = stream.stream
+    self.assertTrue(stream.closed)
+    self.assertTrue(inner.closed)
+    with self.assertRaises(ValueError):
+      stream.read()
+    # the chunk generators keep temporary streams (and assets) alive
+    self.assertEqual(
+      list(asset.load('asset:test/data/file1.nl').stream().chunks(4)),
+      [b'line', b'-1\nl', b'ine-', b'2'])
+    self.assertEqual(
+      list(asset.load('asset:test/data/file1.nl').stream().chunks('lines')),
+      [b'line-1\n', b'line-2'])
+    chunker = asset.load('asset:test/data/file1.nl').chunks(7)
+    gc.collect()
+    self.assertEqual(list(chunker), [b'line-1\n', b'line-2'])
+    reader = io.BufferedReader(asset.load('asset:test/data/file1.nl').stream())
+    self.assertEqual(reader.read(), b'line-1\nline-2')
+    if hasattr(hashlib, 'file_digest'):
+      self.assertEqual(
+        hashlib.file_digest(
+          asset.load('asset:test/data/file**').stream(), 'sha1').hexdigest(),
+        hashlib.sha1(b'line-1\nline-2line-3\n').hexdigest())
+
+  #----------------------------------------------------------------------------
+  def test_groupstream_io(self):
+    import io
+    import shutil
+    with asset.load('asset:test/data/file**').stream() as stream:
+      self.assertFalse(stream.seekable())
+      buf = bytearray(9)
+      self.assertEqual(stream.readinto(buf), 9)
+      self.assertEqual(bytes(buf), b'line-1\nli')
+      self.assertEqual(stream.tell(), 9)
+      out = io.BytesIO()
+      shutil.copyfileobj(stream, out, 3)
+      self.assertEqual(out.getvalue(), b'ne-2line-3\n')
+      self.assertEqual(stream.readinto(buf), 0)
+    self.assertTrue(stream.closed)
+
+  #----------------------------------------------------------------------------
+  def test_group_readall(self):
+    files = dict(('data/f%03d.txt' % (idx,), b'%d\n' % (idx,)) for idx in range(300))
+    chk   = b''.join(data for name, data in sorted(files.items()))
+    for zipped in (False, True):
+      pkg = TempPackage('asset_test_readall_%d' % (zipped,), files, zipped=zipped)
+      try:
+        group = asset.load(pkg.name + ':data/*.txt')
+        self.assertEqual(group.stream()._remaining(), len(chk))
+        self.assertEqual(group.read(), chk)
+        self.assertIs(type(asset.load(pkg.name + ':data/*.txt').read()), bytes)
+        self.assertIs(type(group.stream().read()), bytes)
+        self.assertIs(type(group.stream().readall()), bytes)
+        stream = group.stream()
+        self.assertEqual(stream.read(5), chk[:5])
+        self.assertIsNone(stream._remaining())
+        self.assertEqual(stream.read(), chk[5:])
+        self.assertEqual(stream.tell(), len(chk))
+        buf = bytearray(len(chk) + 10)
+        self.assertEqual(group.stream().readinto(buf), len(chk))
+        self.assertEqual(bytes(buf[:len(chk)]), chk)
+      finally:
+        pkg.close()
+
+  #----------------------------------------------------------------------------
+  def test_content_cache(self):
+    pkg = TempPackage('asset_test_cache', {
+      'data/a.txt': b'a', 'data/big.txt': b'x' * 100})
+    asset.cache.enable(maxsize=64, maxentry=32, interval=0)
+    try:
+      spec = pkg.name + ':data/a.txt'
+      self.assertEqual(asset.load(spec).read(), b'a')
+      self.assertEqual(asset.load(spec).read(), b'a')
+      self.assertEqual(asset.load(pkg.name + ':data/*.txt').read(), b'a' + b'x' * 100)
+      stats = asset.cache.stats()
+      self.assertEqual((stats.hits, stats.misses, stats.count), (2, 2, 1))
+      # validation against size/mtime
+      pkg.write('data/a.txt', b'abc')
+      self.assertEqual(asset.load(spec).read(), b'abc')
+      self.assertEqual(asset.cache.stats().misses, 3)
+      # eviction by byte-size
+      for idx in range(3):
+        pkg.write('data/f%d.txt' % (idx,), b'f' * 30)
+        asset.load('%s:data/f%d.txt' % (pkg.name, idx)).read()
+      stats = asset.cache.stats()
+      self.assertLessEqual(stats.size, 64)
+      self.assertGreater(stats.evictions, 0)
+    finally:
+      asset.cache.disable()
+      pkg.close()
+
+  #----------------------------------------------------------------------------
+  def test_group_parallel(self):
+    import threading
+    group = asset.load('asset:test/data/**.nl')
+    self.assertEqual(
+      group.read_all(max_workers=3),
+      [b'line-1\nline-2', b'line-3\n', b'sub-file-line-1\n'])
+    self.assertEqual(
+      group.read_all(max_workers=2, max_bytes=1),
+      [b'line-1\nline-2', b'line-3\n', b'sub-file-line-1\n'])
+    self.assertEqual(
+      list(group.map(lambda item: item.name, max_workers=2)),
+      ['test/data/file1.nl', 'test/data/file2.nl',
+       'test/data/subdir/subfile1.nl'])
+    threads = set()
+    def _work(item):
+      threads.add(threading.current_thread().name)
+      return len(item.read())
+    self.assertEqual(list(group.map(_work, max_workers=4)), [13, 7, 16])
+    self.assertNotIn(threading.current_thread().name, threads)
+    self.assertEqual(
+      asset.load('asset:test/data/file2.nl').read_all(), [b'line-3\n'])
+
+  #----------------------------------------------------------------------------
+  def test_asyncio(self):
+    import asyncio
+    async def _test():
+      item = await asset.aload('asset:test/data/file1.nl')
+      self.assertEqual(await item.aread(), b'line-1\nline-2')
+      group = await asset.aload('asset:test/data/**.nl')
+      self.assertEqual(
+        [ast.name async for ast in group],
+        ['test/data/file1.nl', 'test/data/file2.nl',
+         'test/data/subdir/subfile1.nl'])
+      self.assertEqual(
+        [chunk async for chunk in item.achunks(3)],
+        [b'lin', b'e-1', b'\nli', b'ne-', b'2'])
+      self.assertEqual(
+        [chunk async for chunk in group.achunks('lines')],
+        [b'line-1\n', b'line-2', b'line-3\n', b'sub-file-line-1\n'])
+      async for chunk in group.achunks(2):
+        break
+      self.assertEqual(await group.aread(), b'line-1\nline-2line-3\nsub-file-line-1\n')
+      self.assertFalse((await asset.aload('asset:test/data/*.nope')).exists())
+    asyncio.run(_test())
+
+  #----------------------------------------------------------------------------
+  def test_digest(self):
+    import hashlib
+    from asset import manifest
+    pkg = TempPackage('asset_test_digest', {'a.txt': b'a', 'b.txt': b'bb'})
+    try:
+      item = asset.load(pkg.name + ':a.txt')
+      self.assertEqual(item.digest(), hashlib.sha256(b'a').hexdigest())
+      self.assertEqual(item.digest('md5'), hashlib.md5(b'a').hexdigest())
+      group = asset.load(pkg.name + ':*.txt')
+      chk = group.digest()
+      self.assertEqual(asset.load(pkg.name + ':*.txt').digest(), chk)
+      self.assertNotEqual(asset.load(pkg.name + ':[ab].txt').digest('md5'), chk)
+      # memoized, but invalidated on size/mtime change
+      pkg.write('a.txt', b'aaa')
+      self.assertEqual(item.digest(), hashlib.sha256(b'a').hexdigest())
+      asset.cache.invalidate(pkg.name, 'a.txt')
+      self.assertEqual(item.digest(), hashlib.sha256(b'aaa').hexdigest())
+      self.assertNotEqual(group.digest(), chk)
+      # manifest digests are used as-is
+      manifest.write(pkg.path)
+      asset.invalidate(pkg.name)
+      pkg.write('b.txt', b'changed')
+      self.assertEqual(
+        asset.load(pkg.name + ':b.txt').digest(),
+        hashlib.sha256(b'bb').hexdigest())
+    finally:
+      pkg.close()
+
+  #----------------------------------------------------------------------------
+  def test_copyto(self):
+    import socket
+    data = {'a.txt': b'a' * 100000, 'b.txt': b'bb'}
+    for zipped in (False, True):
+      pkg = TempPackage('asset_test_copyto', data, zipped=zipped)
+      try:
+        # to a file object (with pending buffered writes) & fd
+        with tempfile.TemporaryFile() as fp:
+          fp.write(b'>')
+          self.assertEqual(asset.load(pkg.name + ':a.txt').copyto(fp), 100000)
+          fp.write(b'<')
+          fp.flush()
+          self.assertEqual(
+            asset.load(pkg.name + ':*.txt').copyto(fp.fileno()), 100002)
+          fp.seek(0)
+          self.assertEqual(
+            fp.read(), b'>' + data['a.txt'] + b'<' + data['a.txt'] + b'bb')
+        # to a socket
+        rd, wr = socket.socketpair()
+        try:
+          with asset.load(pkg.name + ':b.txt').stream() as stream:
+            self.assertEqual(asset.copyto(stream, wr), 2)
+          self.assertEqual(rd.recv(10), b'bb')
+          with asset.load(pkg.name + ':a.txt').stream() as stream:
+            stream.read(99990)
+            self.assertEqual(asset.copyto(stream, wr), 10)
+          self.assertEqual(rd.recv(100), b'a' * 10)
+        finally:
+          rd.close()
+          wr.close()
+        # to a non-fd file-like object
+        buf = six.BytesIO()
+        self.assertEqual(asset.load(pkg.name + ':*.txt').copyto(buf), 100002)
+        self.assertEqual(buf.getvalue(), data['a.txt'] + b'bb')
+      finally:
+        pkg.close()
+
+  #----------------------------------------------------------------------------
+  def test_read_range(self):
+    from asset import backend
+    data = b''.join(b'line-%d\n' % (idx,) for idx in range(400000))
+    files = {'big.txt': data, 'empty.txt': b''}
+    for zipped, compression in (
+        (False, None), (True, zipfile.ZIP_STORED), (True, zipfile.ZIP_DEFLATED)):
+      pkg = TempPackage(
+        'asset_test_range', files, zipped=zipped,
+        compression=compression or zipfile.ZIP_DEFLATED)
+      try:
+        item = asset.load(pkg.name + ':big.txt')
+        for offset, length in (
+            (0, 10), (len(data) - 5, 10), (3000000, 100), (1048570, 20),
+            (12345, 2500000), (len(data) + 10, 10), (5, 0), (5, 10 ** 12)):
+          self.assertEqual(
+            item.read_range(offset, length), data[offset:offset + length])
+        self.assertEqual(
+          asset.load(pkg.name + ':empty.txt').read_range(0, 10), b'')
+        with self.assertRaises(ValueError):
+          item.read_range(-3, 5)
+        with self.assertRaises(ValueError):
+          item.read_range(3, -5)
+        with item.stream() as stream:
+          self.assertTrue(stream.seekable())
+          stream.seek(2000000)
+          self.assertEqual(stream.read(10), data[2000000:2000010])
+          self.assertEqual(stream.tell(), 2000010)
+          stream.seek(-8, io.SEEK_END)
+          self.assertEqual(stream.read(), data[-8:])
+          stream.seek(7)
+          self.assertEqual(b''.join(stream.chunks(4096)), data[7:])
+      finally:
+        pkg.close()
+    if hasattr(os, 'pread'):
+      # deflated reads resume from the closest checkpoint
+      pkg = TempPackage('asset_test_range', files, zipped=True)
+      try:
+        store = backend.get(pkg.name)
+        store.read_range('big.txt', len(data) - 10, 10)
+        index = list(store._indexes._data.values())[0][0]
+        self.assertEqual(len(index.offsets), len(data) // backend.CHECKPOINT + 1)
+      finally:
+        pkg.close()
+      # members with more than MAXCHECKPOINTS checkpoints stay indexed
+      # (with thinned checkpoints), so sequential reads stay linear
+      maxcheckpoints = backend.MAXCHECKPOINTS
+      backend.MAXCHECKPOINTS = 3
+      pkg = TempPackage('asset_test_range', files, zipped=True)
+      try:
+        store = backend.get(pkg.name)
+        with asset.load(pkg.name + ':big.txt').stream() as stream:
+          self.assertEqual(b''.join(stream.chunks(4096)), data)
+        self.assertEqual(len(store._indexes), 1)
+        index = list(store._indexes._data.values())[0][0]
+        self.assertLessEqual(len(index.offsets), 3)
+        self.assertEqual(
+          store.read_range('big.txt', len(data) - 10, 10), data[-10:])
+      finally:
+        backend.MAXCHECKPOINTS = maxcheckpoints
+        pkg.close()
+
+  #----------------------------------------------------------------------------
+  def test_transformer(self):
+    import gzip
+    from asset import transform
+    data = b''.join(b'line-%d\n' % (idx,) for idx in range(50000))
+    pkg = TempPackage('asset_test_transform', {
+      'a.txt.gz': gzip.compress(data), 'b.txt.gz': gzip.compress(b'b\n'),
+      'u.txt': u'h\u00e9llo w\u00f6rld\n'.encode('utf-8')})
+    try:
+      item = asset.load(pkg.name + ':a.txt.gz', transformer=transform.gunzip)
+      self.assertEqual(item.read(), data)
+      with item.stream() as stream:
+        self.assertIsInstance(stream, asset.TransformerStream)
+        self.assertIs(stream.asset, item)
+        self.assertEqual(stream.readline(), b'line-0\n')
+        self.assertEqual(stream.read(7), b'line-1\n')
+        self.assertEqual(b''.join(stream.chunks()), data[14:])
+      self.assertEqual(
+        list(item.stream().chunks('lines'))[-1], b'line-49999\n')
+      self.assertEqual(item.read_range(7, 7), b'line-1\n')
+      self.assertEqual(item.buffer().tobytes(), data)
+      # truncated streams are errors, trailing zero padding is not
+      self.assertEqual(b''.join(transform.gunzip(
+        [gzip.compress(b'a'), gzip.compress(b'b') + b'\x00' * 8, b'\x00'])), b'ab')
+      self.assertEqual(b''.join(transform.gunzip([])), b'')
+      with self.assertRaises(EOFError):
+        b''.join(transform.gunzip([gzip.compress(data)[:1000]]))
+      # groups transform each asset; by plugin spec & composed
+      self.assertEqual(
+        asset.load(pkg.name + ':*.gz', transformer='asset.transform.gunzip')
+          .read(), data + b'b\n')
+      check = transform.checksum('md5')
+      buf = six.BytesIO()
+      asset.load(pkg.name + ':b.txt.gz', transformer=[
+        'asset.transform.gunzip', check, lambda chunks: (
+          chunk.upper() for chunk in chunks)]).copyto(buf)
+      self.assertEqual(buf.getvalue(), b'B\n')
+      self.assertEqual(check.hexdigest(), '3b5d5c3712955042212316173ccf37be')
+      # text decoding, with characters split across chunks
+      text = asset.load(pkg.name + ':u.txt', transformer=transform.decode())
+      self.assertEqual(
+        u''.join(text.stream().chunks(3)), u'h\u00e9llo w\u00f6rld\n')
+      self.assertEqual(text.read(), u'h\u00e9llo w\u00f6rld\n')
+      group = asset.load('asset:test/data/*.nl', transformer=transform.decode())
+      self.assertEqual(group.read(), u'line-1\nline-2line-3\n')
+      group = asset.load('asset:test/data/*.nl', transformer=transform.decode())
+      with group.stream() as stream:
+        self.assertEqual(stream.read(4), u'line')
+        self.assertEqual(stream.read(11), u'-1\nline-2li')
+        self.assertEqual(stream.readline(), u'ne-3\n')
+        self.assertEqual(stream.read(), u'')
+      # transformed group content is not preallocated from stat sizes
+      self.assertEqual(
+        asset.load(pkg.name + ':*.gz', transformer=transform.gunzip)
+          .stream().readall(), data + b'b\n')
+      with self.assertRaises(ValueError):
+        asset.load(pkg.name + ':u.txt', transformer='no-such-transformer')
+    finally:
+      pkg.close()
+
+  #----------------------------------------------------------------------------
+  def test_variant(self):
+    pkg = TempPackage('asset_test_variant', {
+      'static/a.css': b'a', 'static/a.css.gz': b'a-gz', 'static/a.css.br': b'a-br',
+      'static/b.js': b'b', 'static/b.js.gz': b'b-gz', 'static/c.txt.gz': b'c-gz'})
+    try:
+      item = asset.load(pkg.name + ':static/a.css')
+      var, enc = item.variant(['br', 'gzip'])
+      self.assertEqual((var.name, enc), ('static/a.css.br', 'br'))
+      self.assertEqual(var.read(), b'a-br')
+      var, enc = item.variant(['zstd', 'gzip', 'br'])
+      self.assertEqual((var.name, enc), ('static/a.css.gz', 'gzip'))
+      self.assertEqual(item.variant(['zstd', 'identity']), (item, None))
+      var, enc = asset.load(pkg.name + ':static/b.js').variant(['br', 'gzip'])
+      self.assertEqual((var.name, enc), ('static/b.js.gz', 'gzip'))
+      self.assertEqual(
+        [ast.name for ast in asset.load(pkg.name + ':static/*', variants=False)],
+        ['static/a.css', 'static/b.js', 'static/c.txt.gz'])
+      self.assertEqual(len(asset.load(pkg.name + ':static/*')), 6)
+    finally:
+      pkg.close()
+
+  #----------------------------------------------------------------------------
+  def test_extract(self):
+    from asset import cache
+    tmpdir = tempfile.mkdtemp()
+    pkg = TempPackage(
+      'asset_test_extract', {'lib/a.bin': b'abc' * 1000, 'b.bin': b'b'},
+      zipped=True)
+    try:
+      cache.CACHEDIR = tmpdir
+      item = asset.load(pkg.name + ':lib/a.bin')
+      self.assertIsNone(item.filename)
+      self.assertIsNone(item.path(extract=False))
+      path = item.path()
+      self.assertTrue(path.startswith(tmpdir))
+      self.assertEqual(os.path.basename(path), 'a.bin')
+      with open(path, 'rb') as fp:
+        self.assertEqual(fp.read(), b'abc' * 1000)
+      self.assertEqual(
+        [name for name in os.listdir(os.path.dirname(path))], ['a.bin'])
+      # reused within the process and across "restarts"
+      mtime = os.stat(path).st_mtime_ns
+      self.assertEqual(item.path(), path)
+      # re-extracted if removed (e.g. by a cache cleaner)
+      os.unlink(path)
+      self.assertEqual(item.path(), path)
+      with open(path, 'rb') as fp:
+        self.assertEqual(fp.read(), b'abc' * 1000)
+      mtime = os.stat(path).st_mtime_ns
+      asset.invalidate(pkg.name)
+      cache.invalidate(pkg.name)
+      self.assertEqual(asset.load(pkg.name + ':lib/a.bin').path(), path)
+      self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+      self.assertNotEqual(asset.load(pkg.name + ':b.bin').path(), path)
+      # zip CRC-32s are only trusted for the same archive member
+      other = TempPackage(
+        'asset_test_extract2', {'lib/a.bin': b'abc' * 1000}, zipped=True)
+      try:
+        self.assertNotEqual(asset.load(other.name + ':lib/a.bin').path(), path)
+      finally:
+        other.close()
+      # backends without stat support still extract missing files
+      cache.CACHEDIR = os.path.join(tmpdir, 'nostat')
+      cache.invalidate()
+      store = asset.backend.get(pkg.name)
+      store.stat = lambda name: None
+      try:
+        path = asset.load(pkg.name + ':lib/a.bin').path()
+        self.assertTrue(path.startswith(cache.CACHEDIR))
+        with open(path, 'rb') as fp:
+          self.assertEqual(fp.read(), b'abc' * 1000)
+      finally:
+        del store.stat
+      # plain files are never extracted
+      self.assertEqual(
+        asset.load('asset:test/data/file1.nl').path(),
+        asset.load('asset:test/data/file1.nl').filename)
+    finally:
+      cache.CACHEDIR = None
+      cache.invalidate()
+      pkg.close()
+      shutil.rmtree(tmpdir)
+
+  #----------------------------------------------------------------------------
+  def test_watch(self):
+    pkg = TempPackage('asset_test_watch', {'data/a.txt': b'a', 'data/b.txt': b'b'})
+    try:
+      asset.cache.enable()
+      events  = []
+      watcher = asset.Watcher(pkg.name + ':data/*.txt', events.append)
+      self.assertIsNone(watcher.poll())
+      group = asset.load(pkg.name + ':data/*.txt')
+      self.assertEqual(group.read(), b'ab')
+      self.assertIsNone(watcher.poll())
+      pkg.write('data/b.txt', b'bbb')
+      pkg.write('data/c.txt', b'c')
+      os.unlink(os.path.join(pkg.path, 'data', 'a.txt'))
+      changes = watcher.poll()
+      self.assertEqual(events, [changes])
+      self.assertEqual([str(ast) for ast in changes.added], [pkg.name + ':data/c.txt'])
+      self.assertEqual([str(ast) for ast in changes.changed], [pkg.name + ':data/b.txt'])
+      self.assertEqual([str(ast) for ast in changes.removed], [pkg.name + ':data/a.txt'])
+      self.assertEqual(changes.changed[0].read(), b'bbb')
+      self.assertEqual(asset.load(pkg.name + ':data/*.txt').read(), b'bbbc')
+      self.assertIsNone(watcher.poll())
+      # in the background
+      watcher = asset.watch(pkg.name + ':data/*.txt', events.append, interval=0.01)
+      try:
+        pkg.write('data/d.txt', b'd')
+        for idx in range(500):
+          if len(events) > 1:
+            break
+          time.sleep(0.01)
+      finally:
+        watcher.stop()
+      self.assertEqual(
+        [str(ast) for ast in events[-1].added], [pkg.name + ':data/d.txt'])
+      # listings of backends without stamps are re-read, but the
+      # backends are not re-created
+      store = asset.backend.get(pkg.name)
+      store.stamp = lambda pkgdir: None
+      watcher = asset.Watcher(pkg.name + ':data/*.txt', events.append)
+      self.assertIsNone(watcher.poll())
+      pkg.write('data/e.txt', b'e')
+      self.assertEqual(
+        [str(ast) for ast in watcher.poll().added], [pkg.name + ':data/e.txt'])
+      self.assertIs(asset.backend.get(pkg.name), store)
+    finally:
+      asset.cache.disable()
+      pkg.close()
+
+  #----------------------------------------------------------------------------
+  def test_stat(self):
+    files = {'data/a.txt': b'a' * 10, 'data/b.txt': b'b' * 20}
+    for zipped in (False, True):
+      pkg = TempPackage('asset_test_stat', files, zipped=zipped)
+      try:
+        item = asset.load(pkg.name + ':data/a.txt')
+        self.assertEqual(item.size, 10)
+        self.assertAlmostEqual(item.mtime, time.time(), delta=10)
+        self.assertEqual(item.total_size(), 10)
+        group = asset.load(pkg.name + ':data/*.txt')
+        self.assertEqual(group.total_size(), 30)
+        st = group.stat()
+        self.assertEqual((st.count, st.size), (2, 30))
+        self.assertEqual(st.mtime, max(ast.mtime for ast in group))
+        self.assertIsNone(asset.load(pkg.name + ':data/nope.txt').size)
+        with self.assertRaises(asset.NoSuchAsset):
+          asset.load(pkg.name + ':data/*.nope').total_size()
+      finally:
+        pkg.close()
+
+  #----------------------------------------------------------------------------
+  def test_load_patterns(self):
+    pkg = TempPackage('asset_test_patterns', {
+      'static/a.css': b'a', 'static/b.js': b'b', 'static/c.txt': b'c',
+      'static/a.css.map': b'm', 'static/vendor/v.js': b'v',
+      'templates/t.html': b't', 'other/o.css': b'o'})
+    try:
+      group = asset.load([
+        pkg.name + ':static/**.css', pkg.name + ':static/**.js',
+        pkg.name + ':static/*.css', pkg.name + ':templates/**.html',
+        'asset:test/data/file1.nl'])
+      self.assertEqual([str(ast) for ast in group], [
+        pkg.name + ':static/a.css', pkg.name + ':static/b.js',
+        pkg.name + ':static/vendor/v.js', pkg.name + ':templates/t.html',
+        'asset:test/data/file1.nl'])
+      self.assertEqual(group.read(), b'abvtline-1\nline-2')
+      self.assertEqual(len(group.parts), 2)
+      self.assertEqual(group.parts[0][1], '')
+      # excludes prune the walk
+      group = asset.load(
+        [pkg.name + ':static/**'], exclude=['**.map', pkg.name + ':static/vendor/**'])
+      seen = []
+      prune = group.parts[0][3]
+      group._parts = ((pkg.name, 'static', group.parts[0][2],
+                       lambda path: seen.append(path) or prune(path)),)
+      self.assertEqual(
+        [ast.name for ast in group],
+        ['static/a.css', 'static/b.js', 'static/c.txt'])
+      self.assertEqual(seen, ['static/vendor'])
+      self.assertFalse(
+        asset.load(pkg.name + ':static/*.css', exclude='static/a.*').exists())
+      self.assertEqual(
+        [ast.name for ast in asset.load(
+          pkg.name + ':static/*.css*', exclude='static/*.map')],
+        ['static/a.css'])
+    finally:
+      pkg.close()
+
+  #----------------------------------------------------------------------------
+  def test_load_limit(self):
+    from asset import backend
+    files = dict(('data/%03d.txt' % (idx,), b'x') for idx in range(100))
+    files['data/sub/z.txt'] = b'z'
+    pkg = TempPackage('asset_test_limit', files)
+    try:
+      names = [ast.name for ast in asset.load(pkg.name + ':data/**.txt', limit=3)]
+      self.assertEqual(names, ['data/000.txt', 'data/001.txt', 'data/002.txt'])
+      self.assertEqual(len(asset.load(pkg.name + ':data/**.txt')), 101)
+      # unsorted, streamed listing that stops at the first match
+      seen  = []
+      store = backend.get(pkg.name)
+      listdir = store.listdir
+      def _listdir(pkgdir):
+        for entry in listdir(pkgdir):
+          seen.append(entry)
+          yield entry
+      store.listdir = _listdir
+      try:
+        group = asset.load(pkg.name + ':data/**.txt', limit=1, order='any')
+        self.assertTrue(group.exists())
+        self.assertEqual(len(group), 1)
+        self.assertEqual(len(seen), 1)
+        self.assertEqual(
+          sorted(ast.name for ast in asset.load(
+            pkg.name + ':data/**.txt', order='any')),
+          sorted(files.keys()))
+      finally:
+        del store.listdir
+      # directory listings are closed when the walk stops early
+      closed  = []
+      scandir = backend.os.scandir
+      class _scandir(object):
+        def __init__(self, path):
+          self.entries = scandir(path)
+        def __enter__(self):
+          return self.entries.__enter__()
+        def __exit__(self, *args):
+          closed.append(True)
+          return self.entries.__exit__(*args)
+      backend.os.scandir = _scandir
+      try:
+        self.assertEqual(
+          len(asset.load(pkg.name + ':data/**.txt', limit=1, order='any')), 1)
+        self.assertEqual(closed, [True])
+      finally:
+        backend.os.scandir = scandir
+      self.assertFalse(
+        asset.load(pkg.name + ':data/*.nope', limit=1, order='any').exists())
+      with self.assertRaises(ValueError):
+        asset.load(pkg.name + ':data/*.txt', order='random')
+    finally:
+      pkg.close()
+
   #----------------------------------------------------------------------------
   def test_csv(self):
     import csv
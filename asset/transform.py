@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+#------------------------------------------------------------------------------
+# file: $Id$
+# auth: metagriffin <mg.github@uberdev.org>
+# date: 2026/10/18
+# copy: (C) Copyright 2013-EOT metagriffin -- see LICENSE.txt
+#------------------------------------------------------------------------------
+# This software is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#------------------------------------------------------------------------------
+
+'''
+Streaming asset transformers. A transformer is any callable that
+takes an iterable of content chunks and returns an iterable of
+(transformed) chunks, typically a generator, e.g.::
+
+  def upper(chunks):
+    for chunk in chunks:
+      yield chunk.upper()
+
+  asset.load('mypackage:data/*.txt', transformer=upper).read()
+
+Since chunks are processed one at a time, transforming an asset
+requires constant memory regardless of its size. Transformers can also
+be registered as plugins in the ``asset.transformers`` entrypoint
+group and then referred to by plugin spec (see :func:`asset.plugins`),
+e.g. ``transformer='gunzip'``; the built-in transformers below are
+registered under their function names.
+'''
+
+import zlib
+import codecs
+import hashlib
+
+from .isstr import isstr
+from .cache import LRUCache
+
+#------------------------------------------------------------------------------
+
+GROUP = 'asset.transformers'
+
+#------------------------------------------------------------------------------
+def _decompress(chunks, factory):
+  obj  = factory()
+  seen = False
+  for chunk in chunks:
+    while chunk:
+      if obj.eof:
+        # concatenated streams (e.g. multi-member gzip files); as with
+        # `gzip`, zero padding after a stream is ignored
+        chunk = chunk.lstrip(b'\x00')
+        if not chunk:
+          break
+        obj = factory()
+      seen = True
+      buf  = obj.decompress(chunk)
+      if buf:
+        yield buf
+      chunk = obj.unused_data if obj.eof else b''
+  if seen and not obj.eof:
+    raise EOFError(
+      'Compressed stream ended before the end-of-stream marker was reached')
+
+#------------------------------------------------------------------------------
+def gunzip(chunks):
+  '''
+  Decompresses gzip-compressed content.
+  '''
+  return _decompress(chunks, lambda: zlib.decompressobj(16 + zlib.MAX_WBITS))
+
+#------------------------------------------------------------------------------
+def inflate(chunks):
+  '''
+  Decompresses zlib- or gzip-compressed content (auto-detected).
+  '''
+  return _decompress(chunks, lambda: zlib.decompressobj(32 + zlib.MAX_WBITS))
+
+#------------------------------------------------------------------------------
+def bunzip2(chunks):
+  '''
+  Decompresses bzip2-compressed content.
+  '''
+  import bz2
+  return _decompress(chunks, bz2.BZ2Decompressor)
+
+#------------------------------------------------------------------------------
+def unxz(chunks):
+  '''
+  Decompresses xz- or lzma-compressed content.
+  '''
+  import lzma
+  return _decompress(chunks, lzma.LZMADecompressor)
+
+#------------------------------------------------------------------------------
+def decode(encoding='utf-8', errors='strict'):
+  '''
+  Returns a transformer that incrementally decodes binary content into
+  text using `encoding`, i.e. multi-byte characters split across
+  chunks are handled correctly.
+  '''
+  def _decode(chunks):
+    decoder = codecs.getincrementaldecoder(encoding)(errors)
+    for chunk in chunks:
+      buf = decoder.decode(chunk)
+      if buf:
+        yield buf
+    buf = decoder.decode(b'', final=True)
+    if buf:
+      yield buf
+  return _decode
+
+#------------------------------------------------------------------------------
+class checksum(object):
+  '''
+  A pass-through transformer that computes the hashlib `algorithm`
+  digest of the content that flows through it. The digest is available
+  via :meth:`hexdigest` (or :meth:`digest`) once the content has been
+  consumed, e.g.::
+
+    check = asset.transform.checksum('sha1')
+    asset.load('mypackage:data.bin', transformer=check).copyto(fp)
+    check.hexdigest()
+  '''
+
+  #----------------------------------------------------------------------------
+  def __init__(self, algorithm='sha256'):
+    self.algorithm = algorithm
+    self.hash      = hashlib.new(algorithm)
+
+  #----------------------------------------------------------------------------
+  def __call__(self, chunks):
+    for chunk in chunks:
+      self.hash.update(chunk)
+      yield chunk
+
+  #----------------------------------------------------------------------------
+  def digest(self):
+    return self.hash.digest()
+
+  #----------------------------------------------------------------------------
+  def hexdigest(self):
+    return self.hash.hexdigest()
+
+#------------------------------------------------------------------------------
+def pipeline(*transformers):
+  '''
+  Returns a transformer that applies each of `transformers` in order.
+  '''
+  def _pipeline(chunks):
+    for transformer in transformers:
+      chunks = transformer(chunks)
+    return chunks
+  return _pipeline
+
+#------------------------------------------------------------------------------
+
+_resolved = LRUCache(256)
+
+#------------------------------------------------------------------------------
+def resolve(transformer):
+  '''
+  Returns the transformer callable for `transformer`, which can be
+  ``None``, a callable, a plugin spec string that is resolved against
+  the ``asset.transformers`` plugin group (all matching plugins are
+  applied in plugin order), or a list of any of these (which are
+  applied in order). Raises ValueError if a spec matches no plugins.
+  '''
+  if transformer is None or callable(transformer):
+    return transformer
+  if isstr(transformer):
+    ret = _resolved.get(transformer)
+    if ret is None:
+      from .plugin import plugins
+      pset = plugins(GROUP, transformer)
+      if not pset:
+        raise ValueError(
+          'No plugins in group %r matched %r' % (GROUP, transformer))
+      ret = _resolved.put(transformer, pset.handle)
+    return ret
+  return pipeline(*[resolve(item) for item in transformer])
+
+#------------------------------------------------------------------------------
+# end of $Id$
+#------------------------------------------------------------------------------
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+#------------------------------------------------------------------------------
+# file: $Id$
+# auth: metagriffin <mg.github@uberdev.org>
+# date: 2026/10/18
+# copy: (C) Copyright 2013-EOT metagriffin -- see LICENSE.txt
+#------------------------------------------------------------------------------
+# This software is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#------------------------------------------------------------------------------
+
+import logging
+import threading
+
+from aadict import aadict
+
+from .resource import load, Asset, AssetGroup, NoSuchAsset
+from . import backend
+from . import index
+from . import cache
+
+#------------------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+#------------------------------------------------------------------------------
+class Watcher(object):
+  '''
+  Polls the assets matching the asset-spec `spec` every `interval`
+  seconds and, whenever assets were added, changed (in size or mtime)
+  or removed, invalidates the library's cached listings, content,
+  digests and extracted paths for them and calls `callback` with an
+  aadict of the `added`, `changed` and `removed` :class:`Asset` lists.
+  Only ``stat``-level information is polled, i.e. no OS-specific
+  change notification APIs are used.
+  '''
+
+  #----------------------------------------------------------------------------
+  def __init__(self, spec, callback, interval=cache.INTERVAL):
+    self.spec     = spec
+    self.callback = callback
+    self.interval = interval
+    self._state   = None
+    self._group   = None
+    self._stop    = threading.Event()
+    self._thread  = None
+
+  #----------------------------------------------------------------------------
+  def start(self):
+    '''
+    Takes the initial snapshot and starts polling in a daemon thread.
+    '''
+    if self._state is None:
+      self._state = self._snapshot()
+    self._stop.clear()
+    self._thread = threading.Thread(
+      target=self._run, name='asset-watcher(%s)' % (self.spec,))
+    self._thread.daemon = True
+    self._thread.start()
+    return self
+
+  #----------------------------------------------------------------------------
+  def stop(self):
+    '''
+    Stops polling (and waits for the polling thread to exit).
+    '''
+    self._stop.set()
+    thread, self._thread = self._thread, None
+    if thread is not None and thread is not threading.current_thread():
+      thread.join()
+
+  #----------------------------------------------------------------------------
+  def _run(self):
+    while not self._stop.wait(self.interval):
+      try:
+        self.poll()
+      except Exception:
+        log.exception('asset watcher for %r failed', self.spec)
+
+  #----------------------------------------------------------------------------
+  def poll(self):
+    '''
+    Checks for changes immediately: if there are any, the caches are
+    invalidated and the `callback` is called. Returns the changes (or
+    ``None`` if there were none).
+    '''
+    old = self._state
+    if old is None:
+      self._state = self._snapshot()
+      return None
+    new = self._state = self._snapshot()
+    changes = aadict(
+      added   = sorted(key for key in new if key not in old),
+      changed = sorted(key for key in new if key in old and new[key] != old[key]),
+      removed = sorted(key for key in old if key not in new),
+    )
+    if not ( changes.added or changes.changed or changes.removed ):
+      return None
+    for pkg, res in changes.added + changes.changed + changes.removed:
+      cache.invalidate(pkg, res)
+      if '/' in res:
+        index.get(pkg).invalidate(res.rsplit('/', 1)[0])
+      else:
+        index.get(pkg).invalidate('')
+    for key in changes:
+      changes[key] = [Asset(self._group, pkg, res) for pkg, res in changes[key]]
+    self.callback(changes)
+    return changes
+
+  #----------------------------------------------------------------------------
+  def _snapshot(self):
+    # returns a dict of (package, name) => (size, mtime) for all the
+    # assets that currently match `spec`
+    item = load(self.spec)
+    self._group = item if isinstance(item, AssetGroup) else item.group
+    for package in set(part[0] for part in self._group.parts):
+      if backend.get(package).stamp('') is None:
+        # listings cannot be validated, so they must be re-read (but
+        # the backend itself, shared with all other users, is kept)
+        index.get(package).invalidate()
+    ret = dict()
+    try:
+      for pkg, res in item.resources():
+        st = backend.get(pkg).stat(res)
+        ret[(pkg, res)] = None if st is None else (st.size, st.mtime)
+    except NoSuchAsset:
+      pass
+    return ret
+
+#------------------------------------------------------------------------------
+def watch(spec, callback, interval=cache.INTERVAL):
+  '''
+  Starts watching the assets matching the asset-spec `spec` for
+  changes, calling `callback` with the added, changed and removed
+  assets (see :class:`Watcher`). Returns the (started) Watcher, which
+  can be stopped via :meth:`Watcher.stop`.
+  '''
+  return Watcher(spec, callback, interval=interval).start()
+
+#------------------------------------------------------------------------------
+# end of $Id$
+#------------------------------------------------------------------------------
@@ -50,7 +50,17 @@ dependencies = [
   'aadict               >= 0.2.2',
 ]
 
-entrypoints = None
+entrypoints = {
+  'distutils.commands': [
+    'asset_manifest       = asset.build:asset_manifest',
+  ],
+  'asset.transformers': [
+    'gunzip               = asset.transform:gunzip',
+    'inflate              = asset.transform:inflate',
+    'bunzip2              = asset.transform:bunzip2',
+    'unxz                 = asset.transform:unxz',
+  ],
+}
 
 classifiers = [
   'Development Status :: 5 - Production/Stable',